@@ -1,79 +1,89 @@
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
-from typing import IO, List, Optional, Type, Union
-
-from basictdf.tdfBlock import (
-    AnalogData,
-    AnthropometricData,
-    Block,
-    BlockType,
-    CalibrationData2D,
-    ForcePlatformsCalibrationData2D,
-    GeneralCalibrationData,
-    NotDefinedBlock,
-    UnusedBlock,
-    VolumetricData,
-)
+from typing import IO, Dict, List, Optional, Type, Union
+
+from basictdf.tdfBlock import _BLOCK_CLASSES, Block, BlockType
 from basictdf.tdfForcePlatformsData import ForcePlatformsDataBlock
 from basictdf.tdfCalibrationData import CalibrationDataBlock
-from basictdf.tdfData2D import Data2D
+from basictdf.tdfData2D import Data2D  # noqa: F401 (registers the block class)
 from basictdf.tdfData3D import Data3D
 from basictdf.tdfEMG import EMG
 from basictdf.tdfEvents import TemporalEventsData
 from basictdf.tdfForce3D import ForceTorque3D
-from basictdf.tdfOpticalSystem import OpticalSetupBlock
-from basictdf.tdfTypes import BTSDate, BTSString, i32, u32
+from basictdf.tdfOpticalSystem import OpticalSetupBlock  # noqa: F401
+from basictdf.tdfTypes import BTSDate, BTSString
 from basictdf.tdfUtils import (
     provide_context_if_needed,
+    provide_entries_if_needed,
     raise_if_outside_context,
     raise_if_outside_write_context,
 )
-from basictdf.tdfForcePlatformsCalibration import ForcePlatformsCalibrationDataBlock
+from basictdf.tdfForcePlatformsCalibration import (  # noqa: F401
+    ForcePlatformsCalibrationDataBlock,
+)
+import mmap
+import operator
+import os
 import shutil
+import struct
+
+import numpy as np
+
+_HEADER_STRUCT = struct.Struct("<16sIi8x4s4s4s20x")
+"Layout of the 64 byte TDF header: signature, version, nEntries and dates"
+
+_ENTRY_STRUCT = struct.Struct("<IIii4s4s4s4x256s")
+"Layout of a 288 byte jumptable entry"
+
+_ENTRY_DTYPE = np.dtype(
+    [
+        ("type", "<u4"),
+        ("format", "<u4"),
+        ("offset", "<i4"),
+        ("size", "<i4"),
+        ("creation_date", "<i4"),
+        ("last_modification_date", "<i4"),
+        ("last_access_date", "<i4"),
+        ("reserved", "<i4"),
+        ("comment", "S256"),
+    ]
+)
+"Same layout as `_ENTRY_STRUCT`, used to parse the whole jumptable at once"
+
+_ENTRY_OFFSET_STRUCT = struct.Struct("<i")
+"The block offset field of a jumptable entry"
+
+_ENTRY_OFFSET_POS = _ENTRY_DTYPE.fields["offset"][1]
+"Position of the block offset field inside a jumptable entry"
+
+_POPULATE_LIMIT = 100 * 1024 * 1024
+"Files up to this size are read ahead entirely when mapped (Linux only)"
 
 
 def _get_block_class(block_type: BlockType) -> Type[Block]:
-    if block_type == BlockType.unusedSlot:
-        return UnusedBlock
-    elif block_type == BlockType.notDefined:
-        return NotDefinedBlock
-    elif block_type == BlockType.calibrationData:
-        return CalibrationDataBlock
-    elif block_type == BlockType.calibrationData2D:
-        return CalibrationData2D
-    elif block_type == BlockType.data2D:
-        return Data2D
-    elif block_type == BlockType.data3D:
-        return Data3D
-    elif block_type == BlockType.opticalSystemConfiguration:
-        return OpticalSetupBlock
-    elif block_type == BlockType.forcePlatformsCalibrationData:
-        return ForcePlatformsCalibrationDataBlock
-    elif block_type == BlockType.forcePlatformsCalibrationData2D:
-        return ForcePlatformsCalibrationData2D
-    elif block_type == BlockType.forcePlatformsData:
-        return ForcePlatformsDataBlock
-    elif block_type == BlockType.anthropometricData:
-        return AnthropometricData
-    elif block_type == BlockType.electromyographicData:
-        return EMG
-    elif block_type == BlockType.forceAndTorqueData:
-        return ForceTorque3D
-    elif block_type == BlockType.volumetricData:
-        return VolumetricData
-    elif block_type == BlockType.analogData:
-        return AnalogData
-    elif block_type == BlockType.generalCalibrationData:
-        return GeneralCalibrationData
-    elif block_type == BlockType.temporalEventsData:
-        return TemporalEventsData
-    else:
+    try:
+        return _BLOCK_CLASSES[block_type]
+    except KeyError:
         raise Exception("Unknown block type")
 
 
 class TdfEntry:
     """A jumptable type entry for a data block."""
 
+    __slots__ = (
+        "type",
+        "format",
+        "offset",
+        "size",
+        "creation_date",
+        "last_modification_date",
+        "last_access_date",
+        "comment",
+        "nBytes",
+        "header_offset",
+    )
+
     def __init__(
         self,
         type: BlockType,
@@ -84,6 +94,7 @@ class TdfEntry:
         last_modification_date: datetime,
         last_access_date: datetime,
         comment: str,
+        header_offset: Optional[int] = None,
     ) -> None:
         self.type = type
         self.format = format
@@ -93,41 +104,75 @@ class TdfEntry:
         self.last_modification_date = last_modification_date
         self.last_access_date = last_access_date
         self.comment = comment
-        self.nBytes = 8 * 4 + 256
+        self.nBytes = _ENTRY_STRUCT.size
+        # where the entry itself is stored in the jumptable, if known
+        self.header_offset = header_offset
+
+    def _pack(self) -> bytes:
+        return _ENTRY_STRUCT.pack(
+            self.type.value,
+            self.format,
+            self.offset,
+            self.size,
+            BTSDate.write(self.creation_date),
+            BTSDate.write(self.last_modification_date),
+            BTSDate.write(self.last_access_date),
+            BTSString.write(256, self.comment),
+        )
 
     def _write(self, file) -> None:
-        u32.bwrite(file, self.type.value)
-        u32.bwrite(file, self.format)
-        i32.bwrite(file, self.offset)
-        i32.bwrite(file, self.size)
-        BTSDate.bwrite(file, self.creation_date)
-        BTSDate.bwrite(file, self.last_modification_date)
-        BTSDate.bwrite(file, self.last_access_date)
-        i32.bpad(file)
-        BTSString.bwrite(file, 256, self.comment)
+        file.write(self._pack())
 
     @staticmethod
-    def _build(file) -> "TdfEntry":
-        type_ = BlockType(u32.bread(file))
-        format = u32.bread(file)
-        offset = i32.bread(file)
-        size = i32.bread(file)
-        creation_date = BTSDate.bread(file)
-        last_modification_date = BTSDate.bread(file)
-        last_access_date = BTSDate.bread(file)
-        i32.skip(file)
-        comment = BTSString.bread(file, 256)
-        return TdfEntry(
+    def _unpack_from(buffer, offset: int = 0) -> "TdfEntry":
+        """Build an entry from a buffer that holds the whole 288 byte record
+        starting at `offset`"""
+        (
             type_,
             format,
-            offset,
+            block_offset,
             size,
             creation_date,
             last_modification_date,
             last_access_date,
             comment,
+        ) = _ENTRY_STRUCT.unpack_from(buffer, offset)
+        return TdfEntry(
+            BlockType(type_),
+            format,
+            block_offset,
+            size,
+            BTSDate.read(creation_date),
+            BTSDate.read(last_modification_date),
+            BTSDate.read(last_access_date),
+            BTSString.read(256, comment),
         )
 
+    @staticmethod
+    def _from_record(
+        record: np.void,
+        creation_date: datetime,
+        last_modification_date: datetime,
+        last_access_date: datetime,
+    ) -> "TdfEntry":
+        """Build an entry from a record of a `_ENTRY_DTYPE` array. The dates
+        are decoded by the caller."""
+        comment = record["comment"]
+        return TdfEntry(
+            BlockType(record["type"]),
+            int(record["format"]),
+            int(record["offset"]),
+            int(record["size"]),
+            creation_date,
+            last_modification_date,
+            last_access_date,
+            BTSString.read(len(comment), comment),
+        )
+
+    @staticmethod
+    def _build(file) -> "TdfEntry":
+        return TdfEntry._unpack_from(file.read(_ENTRY_STRUCT.size))
+
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, TdfEntry):
             return False
@@ -151,6 +196,52 @@ class TdfEntry:
         )
 
 
+class _LazyBlocks(Sequence):
+    """The blocks of a Tdf file. Each one is only parsed the first time it is
+    accessed. Parsed blocks are kept until the file changes on disk or a block
+    is added or removed, so the cache also works outside a ``with`` block."""
+
+    def __init__(self, tdf: "Tdf") -> None:
+        self._tdf = tdf
+        self._generation = tdf._generation
+        self._cache: Dict[int, Block] = {}
+
+    def __len__(self) -> int:
+        return len(self._tdf.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[n] for n in range(*index.indices(len(self)))]
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if self._generation != self._tdf._generation:
+            self._cache.clear()
+            self._generation = self._tdf._generation
+        if index not in self._cache:
+            self._cache[index] = self._tdf.get_block(index)
+        return self._cache[index]
+
+    def __iter__(self):
+        if self._tdf._inside_context:
+            return (self[n] for n in range(len(self)))
+        # outside a context the file is opened once for all the blocks,
+        # instead of once per block
+        with self._tdf:
+            return iter([self[n] for n in range(len(self))])
+
+    def __eq__(self, o: object) -> bool:
+        if not isinstance(o, Sequence):
+            return NotImplemented
+        if not self._tdf._inside_context:
+            with self._tdf:
+                return self == o
+        return len(self) == len(o) and all(a == b for a, b in zip(self, o))
+
+    def __repr__(self) -> str:
+        return f"<{len(self)} blocks of {self._tdf.file_path}>"
+
+
 class Tdf:
     SIGNATURE = b"\x82K`A\xd3\x11\x84\xca`\x00\xb6\xac\x16h\x0c\x08"
     "The signature of a TDF file"
@@ -163,6 +254,14 @@ class Tdf:
 
         self._mode = "rb"
         self._inside_context = False
+        self._raw_entries: Optional[np.ndarray] = None
+        self._entries: Optional[List[TdfEntry]] = None
+        self._by_type: Dict[BlockType, int] = {}
+        self._nBlocks = 0
+        # bumped whenever the parsed blocks may have changed
+        self._generation = 0
+        # modification time and size of the file when it was last opened
+        self._stamp: Optional[tuple] = None
 
     def allow_write(self) -> "Tdf":
         """Allow writing to the file."""
@@ -171,27 +270,63 @@ class Tdf:
 
     def __enter__(self) -> "Tdf":
         self._inside_context = True
-        self.handler: IO[bytes] = self.file_path.open(self._mode)
+        self._file: IO[bytes] = self.file_path.open(self._mode)
+
+        # reopening an unchanged file keeps the parsed blocks
+        stamp = self._file_stamp(os.fstat(self._file.fileno()))
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._generation += 1
+
+        # Read only files are memory mapped, so blocks are read straight from
+        # the page cache. Files opened for writing keep the regular handler,
+        # since adding and removing blocks changes the size of the file and
+        # resizing a mapping isn't supported on every platform.
+        self.handler: Union[IO[bytes], mmap.mmap]
+        if self._mode == "rb":
+            try:
+                self.handler = self._map_read_only()
+            except ValueError:
+                self._inside_context = False
+                self._file.close()
+                raise Exception("Invalid TDF file")
+            # the header and the jumptable are read right away
+            self._advise(
+                "MADV_WILLNEED", 0, _HEADER_STRUCT.size + 14 * _ENTRY_STRUCT.size
+            )
+        else:
+            self.handler = self._file
 
-        self.signature = self.handler.read(len(self.SIGNATURE))
+        header = self.handler.read(_HEADER_STRUCT.size)
 
-        if self.signature != self.SIGNATURE:
+        # check the signature before decoding anything else
+        if len(header) != _HEADER_STRUCT.size or not header.startswith(self.SIGNATURE):
+            self.__exit__(None, None, None)
             raise Exception("Invalid TDF file")
 
-        self.version = u32.bread(self.handler)
-        self.nEntries = i32.bread(self.handler)
-
-        # pad 8 bytes
-        i32.skip(self.handler, 2)
-
-        self.creation_date = BTSDate.bread(self.handler)
-        self.last_modification_date = BTSDate.bread(self.handler)
-        self.last_access_date = BTSDate.bread(self.handler)
-
-        # pad 20 bytes
-        i32.skip(self.handler, 5)
-
-        self.entries = [TdfEntry._build(self.handler) for _ in range(self.nEntries)]
+        # the signature was already checked, it isn't kept
+        (
+            _,
+            self.version,
+            self.nEntries,
+            creation_date,
+            last_modification_date,
+            last_access_date,
+        ) = _HEADER_STRUCT.unpack(header)
+
+        self.creation_date = BTSDate.read(creation_date)
+        self.last_modification_date = BTSDate.read(last_modification_date)
+        self.last_access_date = BTSDate.read(last_access_date)
+
+        # the whole jumptable is parsed at once. TdfEntry objects are only
+        # built when the entries are first accessed
+        self._raw_entries = np.frombuffer(
+            self.handler.read(_ENTRY_STRUCT.size * self.nEntries),
+            dtype=_ENTRY_DTYPE,
+            count=self.nEntries,
+        )
+        self._entries = None
+        self._index_entries(self._raw_entries["type"])
 
         return self
 
@@ -199,12 +334,91 @@ class Tdf:
         self._inside_context = False
         self._mode = "rb"
         self.handler.close()
+        self._file.close()
+
+    @staticmethod
+    def _file_stamp(stat: os.stat_result) -> tuple:
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _changed_on_disk(self) -> bool:
+        """Whether the file was modified since it was last opened."""
+        return self._file_stamp(os.stat(self.file_path)) != self._stamp
+
+    def _map_read_only(self) -> mmap.mmap:
+        """Map the open file read only. Where supported, small files are
+        prefaulted in a single call instead of page by page."""
+        fileno = self._file.fileno()
+        if (
+            hasattr(mmap, "MAP_POPULATE")
+            and os.fstat(fileno).st_size <= _POPULATE_LIMIT
+        ):
+            return mmap.mmap(
+                fileno,
+                0,
+                flags=mmap.MAP_SHARED | mmap.MAP_POPULATE,
+                prot=mmap.PROT_READ,
+            )
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+    def _advise(self, option: str, start: int, length: int) -> None:
+        """Hint the kernel about how a region of the mapped file is going to
+        be accessed. `option` is the name of one of the mmap.MADV_* constants.
+        Does nothing if the file isn't mapped or the platform lacks it."""
+        if not isinstance(self.handler, mmap.mmap) or not hasattr(mmap, option):
+            return
+        # madvise needs a page aligned start
+        aligned_start = start - start % mmap.PAGESIZE
+        if length > 0 and aligned_start < len(self.handler):
+            self.handler.madvise(
+                getattr(mmap, option), aligned_start, length + start - aligned_start
+            )
+
+    def _index_entries(self, types: Optional[np.ndarray] = None) -> None:
+        """Rebuild the index that maps each block type to the position of its
+        entry. If several entries share a type, the first one wins, so
+        unused slots map to the first free one."""
+        if types is None:
+            types = np.array([entry.type.value for entry in self.entries])
+        values, first = np.unique(types, return_index=True)
+        self._by_type = {
+            BlockType(type_): n for type_, n in zip(values.tolist(), first.tolist())
+        }
+        self._nBlocks = int(np.count_nonzero(types != BlockType.unusedSlot.value))
 
     @property
-    @provide_context_if_needed
-    def blocks(self) -> List[Block]:
-        """Get all blocks in the file."""
-        return [self.get_block(entry.type) for entry in self.entries]
+    @provide_entries_if_needed
+    def entries(self) -> List[TdfEntry]:
+        """The entries of the jumptable, including the unused ones."""
+        if self._entries is None:
+            raw = self._raw_entries
+            # Most entries share the same few timestamps (Tdf.new stamps all
+            # of them with the same date), so each distinct one is only
+            # converted to a datetime once.
+            stamps = np.stack(
+                [
+                    raw["creation_date"],
+                    raw["last_modification_date"],
+                    raw["last_access_date"],
+                ],
+                axis=1,
+            )
+            unique, inverse = np.unique(stamps.ravel(), return_inverse=True)
+            dates = [datetime.fromtimestamp(stamp) for stamp in unique.tolist()]
+            from_record = TdfEntry._from_record
+            self._entries = [
+                from_record(record, dates[c], dates[m], dates[a])
+                for record, (c, m, a) in zip(raw, inverse.reshape(-1, 3).tolist())
+            ]
+            for n, entry in enumerate(self._entries):
+                entry.header_offset = _HEADER_STRUCT.size + n * _ENTRY_STRUCT.size
+        return self._entries
+
+    @property
+    @provide_entries_if_needed
+    def blocks(self) -> Sequence:
+        """Get all blocks in the file. Blocks are parsed lazily, as they are
+        accessed."""
+        return _LazyBlocks(self)
 
     @provide_context_if_needed
     def get_block(self, index_or_type: Union[BlockType, int]) -> Optional[Type[Block]]:
@@ -217,14 +431,18 @@ class Tdf:
                 raise IndexError(f"Index {index_or_type} out of range")
 
         elif isinstance(index_or_type, BlockType):
-            entry = next((e for e in self.entries if e.type == index_or_type), None)
-            if entry is None:
+            if index_or_type not in self._by_type:
                 raise Exception(f"Block {index_or_type} not found")
+            entry = self.entries[self._by_type[index_or_type]]
 
         else:
             raise TypeError(f"Expected int or BlockType, got {type(index_or_type)}")
 
-        self.handler.seek(entry.offset, 0)
+        # blocks are parsed front to back
+        self._advise("MADV_SEQUENTIAL", entry.offset, entry.size)
+        # walking the blocks in order leaves the handler at the next one
+        if self.handler.tell() != entry.offset:
+            self.handler.seek(entry.offset, 0)
         block_class = _get_block_class(entry.type)
         return block_class._build(self.handler, entry.format)
 
@@ -247,10 +465,10 @@ class Tdf:
         self.replace_block(data) if self.has_data3D else self.add_block(data)
 
     @property
-    @provide_context_if_needed
+    @provide_entries_if_needed
     def has_data3D(self) -> bool:
         """Check if the file has a 3D data block."""
-        return any(entry.type == BlockType.data3D for entry in self.entries)
+        return BlockType.data3D in self._by_type
 
     @property
     @provide_context_if_needed
@@ -279,10 +497,10 @@ class Tdf:
         )
 
     @property
-    @provide_context_if_needed
+    @provide_entries_if_needed
     def has_force_and_torque(self) -> bool:
         """Check if the file has a force and torque data block."""
-        return any(entry.type == BlockType.forceAndTorqueData for entry in self.entries)
+        return BlockType.forceAndTorqueData in self._by_type
 
     @property
     @provide_context_if_needed
@@ -296,10 +514,10 @@ class Tdf:
         self.replace_block(data) if self.has_events else self.add_block(data)
 
     @property
-    @provide_context_if_needed
+    @provide_entries_if_needed
     def has_events(self) -> bool:
         """Check if the TDF file has an events block"""
-        return any(i for i in self.entries if i.type == BlockType.temporalEventsData)
+        return BlockType.temporalEventsData in self._by_type
 
     @property
     @provide_context_if_needed
@@ -313,12 +531,10 @@ class Tdf:
         self.replace_block(data) if self.has_emg else self.add_block(data)
 
     @property
-    @provide_context_if_needed
+    @provide_entries_if_needed
     def has_emg(self) -> bool:
         """Check if the TDF file has an EMG block"""
-        return any(
-            entry.type == BlockType.electromyographicData for entry in self.entries
-        )
+        return BlockType.electromyographicData in self._by_type
 
     @property
     @provide_context_if_needed
@@ -348,23 +564,17 @@ class Tdf:
                 "Can't add blocks, this file was opened in read-only mode"
             )
 
-        try:
-            if self.get_block(newBlock.type):
-                raise ValueError(
-                    (
-                        f"There's already a block of this type {newBlock.type}"
-                        " .Remove it first"
-                    )
+        if newBlock.type != BlockType.unusedSlot and newBlock.type in self._by_type:
+            raise ValueError(
+                (
+                    f"There's already a block of this type {newBlock.type}"
+                    " .Remove it first"
                 )
-        except Exception:
-            pass
+            )
 
         # find first unused slot
-        try:
-            unusedBlockPos = next(
-                n for n, i in enumerate(self.entries) if i.type == BlockType.unusedSlot
-            )
-        except StopIteration:
+        unusedBlockPos = self._by_type.get(BlockType.unusedSlot)
+        if unusedBlockPos is None:
             raise ValueError(f"Block limit reached ({len(self.entries)})")
 
         # write new entry with the offset of that unused slot
@@ -377,26 +587,38 @@ class Tdf:
             last_modification_date=newBlock.last_modification_date,
             last_access_date=datetime.now(),
             comment=comment,
+            header_offset=self.entries[unusedBlockPos].header_offset,
         )
 
         # replace the entry
         self.entries[unusedBlockPos] = new_entry
+        self._generation += 1
 
         # write new entry
-        self.handler.seek(64 + 288 * unusedBlockPos, 0)
+        self.handler.seek(new_entry.header_offset, 0)
         new_entry._write(self.handler)
 
-        # update all unused slots's offset
-        for n, entry in enumerate(
-            self.entries[unusedBlockPos + 1 :], start=unusedBlockPos + 1
-        ):
+        # update all unused slots's offset. Nothing else changes in them, so
+        # only that field is patched
+        for entry in self.entries[unusedBlockPos + 1 :]:
             if entry.type == BlockType.unusedSlot:
                 entry.offset = new_entry.offset + new_entry.size
-                self.handler.seek(64 + 288 * n, 0)
-                entry._write(self.handler)
+                self.handler.seek(entry.header_offset + _ENTRY_OFFSET_POS, 0)
+                self.handler.write(_ENTRY_OFFSET_STRUCT.pack(entry.offset))
             else:
+                self._index_entries()
                 raise IOError("All unused slots must be at the end of the file")
 
+        # all the slots after the new entry are free, so the index is
+        # updated in place: the next one becomes the first free slot
+        if new_entry.type != BlockType.unusedSlot:
+            self._by_type[new_entry.type] = unusedBlockPos
+            self._nBlocks += 1
+            if unusedBlockPos + 1 < len(self.entries):
+                self._by_type[BlockType.unusedSlot] = unusedBlockPos + 1
+            else:
+                del self._by_type[BlockType.unusedSlot]
+
         # write new block
         self.handler.seek(new_entry.offset, 0)
         newBlock._write(self.handler)
@@ -428,25 +650,25 @@ class Tdf:
             type = type.type
 
         # find block
-        try:
-            oldEntryPos, oldEntry = next(
-                (n, i) for n, i in enumerate(self.entries) if i.type == type
-            )
-        except StopIteration:
+        oldEntryPos = self._by_type.get(type)
+        if oldEntryPos is None:
             raise ValueError(f"No block of type {type} found")
-
-        # calculate new offset for the next unused slot
-        newOffset = (
-            self.entries[-1].offset if oldEntryPos != 0 else (64 + 288 * self.nEntries)
-        )
+        oldEntry = self.entries[oldEntryPos]
 
         # delete entry
-        self.entries.remove(oldEntry)
-        self.handler.seek(64 + 288 * oldEntryPos, 0)
+        del self.entries[oldEntryPos]
+        self._generation += 1
         # update all the offsets of the entries preceding the removed one
-        for entry in self.entries[oldEntryPos:]:
+        shiftedEntries = self.entries[oldEntryPos:]
+        for entry in shiftedEntries:
             entry.offset -= oldEntry.size
-            entry._write(self.handler)
+            entry.header_offset -= entry.nBytes
+
+        # the new unused slot starts where the remaining data ends
+        newOffset = max(
+            (entry.offset + entry.size for entry in self.entries),
+            default=_HEADER_STRUCT.size + self.nEntries * _ENTRY_STRUCT.size,
+        )
 
         # add new unused slot at the end
         date = datetime.now()
@@ -459,16 +681,29 @@ class Tdf:
             last_modification_date=date,
             last_access_date=date,
             comment="Generated by basicTDF",
+            header_offset=_HEADER_STRUCT.size
+            + (self.nEntries - 1) * _ENTRY_STRUCT.size,
         )
         self.entries.append(newEntry)
-        newEntry._write(self.handler)
+        self._index_entries()
 
-        self.handler.seek(oldEntry.offset + oldEntry.size, 0)
-        temp = self.handler.read()
-        self.handler.seek(oldEntry.offset, 0)
-        self.handler.write(temp)
-        self.handler.truncate()
+        # the shifted entries and the new one are contiguous in the
+        # jumptable, so they are written in one go
+        self.handler.seek(oldEntry.header_offset, 0)
+        self.handler.write(
+            b"".join(entry._pack() for entry in shiftedEntries + [newEntry])
+        )
+
+        # move whatever is after the removed block in place, so the tail of
+        # the file is never loaded in memory. The jumptable is flushed first,
+        # truncating afterwards needs no further flush.
         self.handler.flush()
+        file_size = os.fstat(self.handler.fileno()).st_size
+        tail_start = oldEntry.offset + oldEntry.size
+        if tail_start < file_size:
+            with mmap.mmap(self.handler.fileno(), 0) as mm:
+                mm.move(oldEntry.offset, tail_start, file_size - tail_start)
+        self.handler.truncate(file_size - oldEntry.size)
 
     @staticmethod
     def new(filename: str) -> "Tdf":
@@ -478,50 +713,30 @@ class Tdf:
             raise FileExistsError("File already exists")
 
         nEntries = 14
-        date = datetime.now()
-        with filePath.open("wb") as f:
-            # signature
-            f.write(Tdf.SIGNATURE)
-            # version
-            i32.bwrite(f, 1)
-            # nEntries
-            i32.bwrite(f, nEntries)
-            # reserved
-            i32.bpad(f, 2)
-            # creation date
-            BTSDate.bwrite(f, date)
-            # last modification date
-            BTSDate.bwrite(f, date)
-            # last access date
-            BTSDate.bwrite(f, date)
-            # reserved
-            i32.bpad(f, 5)
-
-            # start entries
-            entryOffset = 64
-
-            # all entries start with offset to the where entries stop
-            blockOffset = entryOffset + nEntries * 288
-
-            for _ in range(nEntries):
-                # type
-                u32.bwrite(f, 0)
-                # format
-                u32.bwrite(f, 0)
-                # offset
-                i32.bwrite(f, blockOffset)
-                # size
-                i32.bwrite(f, 0)
-                # creation date
-                BTSDate.bwrite(f, date)
-                # last modification date
-                BTSDate.bwrite(f, date)
-                # last access date
-                BTSDate.bwrite(f, date)
-                # reserved
-                i32.bpad(f, 1)
-                # comment
-                BTSString.bwrite(f, 256, "Generated by basicTDF")
+        date = BTSDate.write(datetime.now())
+
+        header = _HEADER_STRUCT.pack(Tdf.SIGNATURE, 1, nEntries, date, date, date)
+
+        # all entries are unused and start where the jumptable stops
+        blockOffset = _HEADER_STRUCT.size + nEntries * _ENTRY_STRUCT.size
+        entry = _ENTRY_STRUCT.pack(
+            BlockType.unusedSlot.value,
+            0,
+            blockOffset,
+            0,
+            date,
+            date,
+            date,
+            BTSString.write(256, "Generated by basicTDF"),
+        )
+
+        # O_EXCL also fails if the file was created since the check above
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        fd = os.open(filePath, flags, 0o666)
+        try:
+            os.write(fd, header + entry * nEntries)
+        finally:
+            os.close(fd)
 
         return Tdf(filePath)
 
@@ -530,11 +745,11 @@ class Tdf:
         """Replace a block of the same type with a new one. This is done by
         removing the old block and adding the new one."""
 
-        old_entry = next((i for i in self.entries if i.type == newBlock.type), None)
-
-        if old_entry is None:
+        if newBlock.type not in self._by_type:
             raise ValueError(f"No block of type {newBlock.type} found")
 
+        old_entry = self.entries[self._by_type[newBlock.type]]
+
         comment = comment if comment is not None else old_entry.comment
 
         self.remove_block(newBlock.type)
@@ -545,11 +760,12 @@ class Tdf:
         """Return the size of the TDF file in bytes"""
         return self.file_path.stat().st_size
 
+    @provide_entries_if_needed
     def __len__(self) -> int:
         """Return the number of blocks in the TDF file
         that are not of type unusedSlot
         """
-        return sum(1 for i in self.entries if i.type != BlockType.unusedSlot)
+        return self._nBlocks
 
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, Tdf):
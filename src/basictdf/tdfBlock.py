@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
-from typing import IO, Optional
+from typing import IO, Dict, Optional, Type
 
 __all__ = ["Block", "BlockType"]
 __doc__ = "Block and block type classes."
@@ -51,6 +51,10 @@ class BuildWriteable(ABC):
         pass
 
 
+_BLOCK_CLASSES: Dict[BlockType, Type["Block"]] = {}
+"Block class used to parse each block type, filled in as blocks are defined"
+
+
 class Block(Sized, BuildWriteable, ABC):
     """
     A class to represent a TDF block.
@@ -58,22 +62,34 @@ class Block(Sized, BuildWriteable, ABC):
 
     type = BlockType.notDefined
 
+    _placeholder = False
+    "Whether this class only stands in for a block type that isn't implemented"
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # every class that declares its own type is used to parse it, but a
+        # placeholder never takes over from an implemented block
+        if "type" in cls.__dict__:
+            if cls._placeholder:
+                _BLOCK_CLASSES.setdefault(cls.type, cls)
+            else:
+                _BLOCK_CLASSES[cls.type] = cls
+
     def __init__(
         self,
         creation_date: Optional[datetime] = None,
         last_modification_date: Optional[datetime] = None,
         last_access_date: Optional[datetime] = None,
     ):
-        self.creation_date = (
-            creation_date if creation_date is not None else datetime.now()
-        )
+        # the clock is read at most once, and only if a date is missing
+        dates = (creation_date, last_modification_date, last_access_date)
+        now = datetime.now() if any(date is None for date in dates) else None
+        self.creation_date = creation_date if creation_date is not None else now
         self.last_modification_date = (
-            last_modification_date
-            if last_modification_date is not None
-            else datetime.now()
+            last_modification_date if last_modification_date is not None else now
         )
         self.last_access_date = (
-            last_access_date if last_access_date is not None else datetime.now()
+            last_access_date if last_access_date is not None else now
         )
 
     @abstractmethod
@@ -86,7 +102,7 @@ class Block(Sized, BuildWriteable, ABC):
 
 class NotImplementedBlock(Block):
     "A block type that is not implemented"
-    type = BlockType.notDefined
+    _placeholder = True
 
     @classmethod
     def _build(cls, *args, **kwargs):
@@ -14,13 +14,24 @@ from basictdf.tdfTypes import (
     TdfType,
     f64,
     i16,
-    i32,
 )
 
 __doc__ = "The TDF Calibration Data block"
 
 CameraMap = TdfType(np.dtype("(1,)<i2"))
 
+CalibrationDataHeader = TdfType(
+    np.dtype(
+        [
+            ("nCams", "<i4"),
+            ("distorsion_model", "<i4"),
+            ("calibration_volume", "3<f4"),
+            ("rotation_matrix", "(3,3)<f4"),
+            ("translation_vector", "3<f4"),
+        ]
+    )
+)
+
 
 class DistorsionModel(IntEnum):
     noDistorsion = 0
@@ -131,28 +142,33 @@ class SeelabCameraData(Sized, BuildWriteable):
         )
 
     def _write(self, file) -> None:
-        MAT3X3D.bwrite(file, self.rotation_matrix)
-        VEC3D.bwrite(file, self.translation_vector)
-        VEC2D.bwrite(file, self.focus)
-        VEC2D.bwrite(file, self.optical_center)
-        VEC2D.bwrite(file, self.radial_distortion)
-        VEC2D.bwrite(file, self.decentering)
-        VEC2D.bwrite(file, self.thin_prism)
-        self.view_port.bwrite(file)
-
-    @property
-    def nBytes(self) -> int:
-        return (
-            MAT3X3D.btype.itemsize  # rotation_matrix
-            + VEC3D.btype.itemsize  # translation_vector
-            + VEC2D.btype.itemsize  # focus
-            + VEC2D.btype.itemsize  # optical_center
-            + VEC2D.btype.itemsize  # radial_distortion
-            + VEC2D.btype.itemsize  # decentering
-            + VEC2D.btype.itemsize  # thin_prism
-            + CameraViewPort.nBytes  # view_port
+        file.write(
+            b"".join(
+                [
+                    MAT3X3D.write(self.rotation_matrix),
+                    VEC3D.write(self.translation_vector),
+                    VEC2D.write(self.focus),
+                    VEC2D.write(self.optical_center),
+                    VEC2D.write(self.radial_distortion),
+                    VEC2D.write(self.decentering),
+                    VEC2D.write(self.thin_prism),
+                    self.view_port.write(),
+                ]
+            )
         )
 
+    nBytes = (
+        MAT3X3D.btype.itemsize  # rotation_matrix
+        + VEC3D.btype.itemsize  # translation_vector
+        + VEC2D.btype.itemsize  # focus
+        + VEC2D.btype.itemsize  # optical_center
+        + VEC2D.btype.itemsize  # radial_distortion
+        + VEC2D.btype.itemsize  # decentering
+        + VEC2D.btype.itemsize  # thin_prism
+        + CameraViewPort.nBytes  # view_port
+    )
+    "Size in bytes of the SeelabCameraData object"
+
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, SeelabCameraData):
             return False
@@ -254,28 +270,31 @@ class BTSCameraData:
         )
 
     def _write(self, file) -> None:
-        MAT3X3D.bwrite(file, self.rotation_matrix)  # rotation_matrix
-        VEC3D.bwrite(file, self.translation_vector)  # translation_vector
-        VEC2D.bwrite(file, self.focus)  # focus
-        VEC2D.bwrite(file, self.optical_center)  # optical_center
-        f64.bwrite(file, self.x_distortion_coefficients)  # x_distortion_coefficients
-        f64.bwrite(file, self.y_distortion_coefficients)  # y_distortion_coefficients
-        self.view_port.bwrite(file)  # view_port
-
-    @property
-    def nBytes(self) -> int:
-        return (
-            MAT3X3D.btype.itemsize  # rotation_matrix
-            + VEC3D.btype.itemsize  # translation_vector
-            + VEC2D.btype.itemsize  # focus
-            + VEC2D.btype.itemsize  # optical_center
-            + f64.btype.itemsize
-            * self.max_distorsion_coefficients  # x_distortion_coefficients
-            + f64.btype.itemsize
-            * self.max_distorsion_coefficients  # y_distortion_coefficients
-            + CameraViewPort.nBytes  # view_port
+        file.write(
+            b"".join(
+                [
+                    MAT3X3D.write(self.rotation_matrix),
+                    VEC3D.write(self.translation_vector),
+                    VEC2D.write(self.focus),
+                    VEC2D.write(self.optical_center),
+                    f64.write(self.x_distortion_coefficients),
+                    f64.write(self.y_distortion_coefficients),
+                    self.view_port.write(),
+                ]
+            )
         )
 
+    nBytes = (
+        MAT3X3D.btype.itemsize  # rotation_matrix
+        + VEC3D.btype.itemsize  # translation_vector
+        + VEC2D.btype.itemsize  # focus
+        + VEC2D.btype.itemsize  # optical_center
+        + f64.btype.itemsize * max_distorsion_coefficients  # x_distortion_coefficients
+        + f64.btype.itemsize * max_distorsion_coefficients  # y_distortion_coefficients
+        + CameraViewPort.nBytes  # view_port
+    )
+    "Size in bytes of the BTSCameraData object"
+
 
 class CalibrationDataBlockFormat(IntEnum):
     """
@@ -361,11 +380,12 @@ class CalibrationDataBlock(Block):
     def _build(stream, format) -> "CalibrationDataBlock":
         format = CalibrationDataBlockFormat(format)
 
-        nCams = i32.bread(stream)
-        distorsion_model = DistorsionModel(i32.bread(stream))
-        calibration_volume = VEC3F.bread(stream)
-        rotation_matrix = MAT3X3F.bread(stream)
-        translation_vector = VEC3F.bread(stream)
+        header = CalibrationDataHeader.bread(stream)
+        nCams = header["nCams"]
+        distorsion_model = DistorsionModel(header["distorsion_model"])
+        calibration_volume = header["calibration_volume"]
+        rotation_matrix = header["rotation_matrix"]
+        translation_vector = header["translation_vector"]
         calibration_map = i16.bread(stream, nCams)
 
         calibration_data = []
@@ -388,21 +408,16 @@ class CalibrationDataBlock(Block):
         )
 
     def _write(self, file) -> None:
-        # nCams
-        nCams = len(self.cam_data)
-        i32.bwrite(file, nCams)
-
-        # DistorsionModel
-        i32.bwrite(file, self.distorsion_model)
-
-        # calibration_volume
-        VEC3F.bwrite(file, self.calibration_volume_size)
-
-        # rotation matrix
-        MAT3X3F.bwrite(file, self.calibration_volume_rotation_matrix)
-
-        # translation_vector
-        VEC3F.bwrite(file, self.calibration_volume_translation_vector)
+        CalibrationDataHeader.bwrite(
+            file,
+            (
+                len(self.cam_data),
+                self.distorsion_model,
+                self.calibration_volume_size,
+                self.calibration_volume_rotation_matrix,
+                self.calibration_volume_translation_vector,
+            ),
+        )
 
         # calibration map
         i16.bwrite(file, self.cameras_calibration_map)
@@ -414,11 +429,7 @@ class CalibrationDataBlock(Block):
     @property
     def nBytes(self) -> int:
         return (
-            i32.btype.itemsize  # nCams
-            + i32.btype.itemsize  # DistorsionModel
-            + VEC3F.btype.itemsize  # calibration_volume
-            + MAT3X3F.btype.itemsize  # rotation matrix
-            + VEC3F.btype.itemsize  # translation_vector
+            CalibrationDataHeader.btype.itemsize
             + i16.btype.itemsize * len(self.cam_data)  # calibration map
             + sum(cam.nBytes for cam in self.cam_data)  # calibration data
         )
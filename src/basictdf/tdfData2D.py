@@ -6,7 +6,19 @@ from enum import Enum
 import numpy as np
 
 from basictdf.tdfBlock import Block, BlockType, Sized, BuildWriteable
-from basictdf.tdfTypes import VEC2F, i32, i16, u32, u16, f32
+from basictdf.tdfTypes import VEC2F, TdfType, i16, u16
+
+Data2DHeader = TdfType(
+    np.dtype(
+        [
+            ("nCams", "<i4"),
+            ("nFrames", "<i4"),
+            ("frequency", "<i4"),
+            ("startTime", "<f4"),
+            ("flags", "<u4"),
+        ]
+    )
+)
 
 
 class Data2DFlags(Enum):
@@ -23,27 +35,28 @@ class Data2DPCK(Sized, BuildWriteable):
         nPointsCaptured = u16.bread(stream, nCameras * nFrames).reshape(
             [nCameras, nFrames]
         )
-        data = np.empty((nFrames, nCameras), dtype=object)
+        # points are stored frame by frame, camera by camera. They are read
+        # at once and each cell gets a view of its own points
+        nPoints = nPointsCaptured.T.ravel()
+        points = VEC2F.bread(stream, int(nPoints.sum()))
+        ends = np.cumsum(nPoints).tolist()
 
-        for frame in range(nFrames):
-            for camera in range(nCameras):
-                nPoints = nPointsCaptured[camera, frame]
-                if nPoints > 0:
-                    data[frame, camera] = VEC2F.bread(stream, nPoints)
+        data = np.empty((nFrames, nCameras), dtype=object)
+        cells = data.reshape(-1)
+        for n in np.flatnonzero(nPoints).tolist():
+            cells[n] = points[ends[n] - nPoints[n] : ends[n]]
         return Data2DPCK(data)
 
     def _write(self, stream) -> None:
         nFrames, nCameras = self.data.shape
-        nPointsCaptured = np.zeros((nCameras, nFrames), dtype=np.uint16)
-        for frame in range(nFrames):
-            for camera in range(nCameras):
-                if self.data[frame, camera] is not None:
-                    nPointsCaptured[camera, frame] = len(self.data[frame, camera])
-        u16.bwrite(stream, nPointsCaptured.flatten())
-        for frame in range(nFrames):
-            for camera in range(nCameras):
-                if self.data[frame, camera] is not None:
-                    VEC2F.bwrite(stream, self.data[frame, camera])
+        cells = [cell for cell in self.data.ravel() if cell is not None]
+        nPointsCaptured = np.array(
+            [0 if cell is None else len(cell) for cell in self.data.ravel()],
+            dtype=np.uint16,
+        )
+        u16.bwrite(stream, nPointsCaptured.reshape(nFrames, nCameras).T.ravel())
+        if cells:
+            VEC2F.bwrite(stream, np.concatenate([np.ravel(cell) for cell in cells]))
 
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, Data2DPCK):
@@ -54,10 +67,7 @@ class Data2DPCK(Sized, BuildWriteable):
     def nBytes(self):
         nFrames, nCameras = self.data.shape
         return 2 * nCameras * nFrames + sum(
-            self.data[i, j].nbytes
-            for i in range(nFrames)
-            for j in range(nCameras)
-            if self.data[i, j] is not None
+            cell.nbytes for cell in self.data.ravel() if cell is not None
         )
 
 
@@ -120,11 +130,12 @@ class Data2D(Block):
         format = Data2DBlockFormat(format)
         if format != Data2DBlockFormat.PCKFormat:
             raise NotImplementedError(f"Data2D format {format} is not implemented yet.")
-        nCams = i32.bread(stream)
-        nFrames = i32.bread(stream)
-        frequency = i32.bread(stream)
-        startTime = f32.bread(stream)
-        flags = Data2DFlags(u32.bread(stream))
+        header = Data2DHeader.bread(stream)
+        nCams = header["nCams"]
+        nFrames = header["nFrames"]
+        frequency = header["frequency"]
+        startTime = header["startTime"]
+        flags = Data2DFlags(header["flags"])
         camMap = u16.bread(stream, nCams)
         data = Data2DPCK._build(stream, nFrames, nCams)
 
@@ -139,22 +150,23 @@ class Data2D(Block):
             raise NotImplementedError(
                 f"Writing Data2D format {self.format} is not implemented yet."
             )
-        i32.bwrite(stream, self.nCams)
-        i32.bwrite(stream, self.nFrames)
-        i32.bwrite(stream, self.frequency)
-        f32.bwrite(stream, self.startTime)
-        u32.bwrite(stream, self.flags.value)
+        Data2DHeader.bwrite(
+            stream,
+            (
+                self.nCams,
+                self.nFrames,
+                self.frequency,
+                self.startTime,
+                self.flags.value,
+            ),
+        )
         i16.bwrite(stream, self._camMap)
         self._data._write(stream)
 
     @property
     def nBytes(self):
         return (
-            4  # nCams
-            + 4  # nFrames
-            + 4  # frequency
-            + 4  # BTSDate.nBytes
-            + 4  # flags
+            Data2DHeader.btype.itemsize
             + 2 * self.nCams  # camMap
             # Size of the data without the None elements
             + self._data.nBytes
@@ -2,8 +2,7 @@ __doc__ = """
 Marker data module.
 """
 from enum import Enum
-from io import BytesIO
-from typing import BinaryIO, Iterable, Iterator, List, Union
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
 
 import numpy as np
 
@@ -14,11 +13,10 @@ from basictdf.tdfTypes import (
     BTSString,
     TdfType,
     Volume,
-    f32,
     i32,
-    u32,
     SegmentData,
 )
+from basictdf.tdfUtils import count_segments, finite_segments, pack_segments
 
 
 class Data3dBlockFormat(Enum):
@@ -46,6 +44,21 @@ LinkType = TdfType(np.dtype([("Track1", "<u4"), ("Track2", "<u4")]))
 
 TrackType = TdfType(np.dtype("<3f4"))
 
+Data3DHeader = TdfType(
+    np.dtype(
+        [
+            ("nFrames", "<i4"),
+            ("frequency", "<i4"),
+            ("startTime", "<f4"),
+            ("nTracks", "<u4"),
+            ("volume", "3<f4"),
+            ("rotationMatrix", "(3,3)<f4"),
+            ("translationVector", "3<f4"),
+            ("flag", "<u4"),
+        ]
+    )
+)
+
 
 class MarkerTrack(Sized, BuildWriteable):
     """
@@ -103,45 +116,50 @@ class MarkerTrack(Sized, BuildWriteable):
         return self.data.shape[0]
 
     @property
-    def _segments(self):
-        maskedTrackData = np.ma.masked_invalid(self.data)
-        return np.ma.clump_unmasked(maskedTrackData.T[0])
+    def _segments(self) -> List[slice]:
+        return finite_segments(self.data[:, 0])
 
     @staticmethod
     def _build(stream, nFrames: int) -> "MarkerTrack":
-        trackData = np.empty(nFrames, dtype=TrackType.btype)
-        trackData[:] = np.NaN
-
-        label = BTSString.bread(stream, 256)
-        nSegments = i32.bread(stream)
-        i32.skip(stream)
+        # label, nSegments and padding
+        header = stream.read(256 + 4 + 4)
+        label = BTSString.read(256, header[:256])
+        nSegments = i32.read(header[256:260])[0]
         segmentData = SegmentData.bread(stream, nSegments)
-        for startFrame, nFrames in segmentData:
-            dat = TrackType.bread(stream, nFrames)
-            trackData[startFrame : startFrame + nFrames] = dat
-        return MarkerTrack(label, trackData)
 
-    def _write(self, file) -> None:
-        # label
-        BTSString.bwrite(file, 256, self.label)
-
-        segments = self._segments
-
-        # nSegments
-        i32.bwrite(file, len(segments))
-
-        # padding
-        i32.bpad(file, 1)
+        # the segments are stored back to back, so they are read at once
+        points = TrackType.bread(stream, int(segmentData["nFrames"].sum()))
+        if (
+            nSegments == 1
+            and segmentData[0]["startFrame"] == 0
+            and len(points) == nFrames
+        ):
+            # a track without gaps is the points themselves. They are copied
+            # because the buffer they were read from is read-only
+            return MarkerTrack(label, points.copy())
+        trackData = np.full(nFrames, np.nan, dtype=TrackType.btype)
+        offset = 0
+        for startFrame, segmentFrames in segmentData.tolist():
+            trackData[startFrame : startFrame + segmentFrames] = points[
+                offset : offset + segmentFrames
+            ]
+            offset += segmentFrames
+        return MarkerTrack(label, trackData)
 
-        for segment in segments:
-            # startFrame
-            i32.bwrite(file, np.array(segment.start))
-            # nFrames
-            i32.bwrite(file, np.array(segment.stop - segment.start))
+    def _pack(self) -> bytes:
+        # the segments cover exactly the frames with a finite X, in order
+        valid = np.isfinite(self.data[:, 0])
+        trackData = self.data[valid]
+        return b"".join(
+            [
+                BTSString.write(256, self.label),  # label
+                pack_segments(valid),  # nSegments, padding, segmentData
+                TrackType.write(trackData),  # trackData
+            ]
+        )
 
-        for segment in segments:
-            # trackData
-            TrackType.bwrite(file, self.data[segment])
+    def _write(self, file) -> None:
+        file.write(self._pack())
 
     @property
     def nBytes(self) -> int:
@@ -149,16 +167,23 @@ class MarkerTrack(Sized, BuildWriteable):
         Returns:
             int: size of the track in bytes
         """
-        base = 256 + 4 + 4
-        for segment in self._segments:
-            base += 4 + 4 + (segment.stop - segment.start) * TrackType.btype.itemsize
-        return base
+        valid = np.isfinite(self.data[:, 0])
+        nSegments = count_segments(valid)
+        return (
+            256  # label
+            + 4  # nSegments
+            + 4  # padding
+            + (4 + 4) * nSegments  # startFrame, nFrames
+            + TrackType.btype.itemsize * int(np.count_nonzero(valid))  # trackData
+        )
 
     def __repr__(self) -> str:
         return f"Track(label={self.label}, nFrames={self.nFrames})"
 
     def __eq__(self, other):
-        return self.label == other.label and np.all(self.data == other.data)
+        if not isinstance(other, MarkerTrack):
+            return False
+        return self.label == other.label and TrackType.equal(self.data, other.data)
 
 
 class Data3D(Block):
@@ -227,6 +252,8 @@ class Data3D(Block):
         self.nFrames = nFrames
 
         self._tracks = []
+        self._labelIndex = {}
+        self.links = []
 
     def add_track(self, track: MarkerTrack) -> None:
         """Adds a track to the data block
@@ -247,8 +274,22 @@ class Data3D(Block):
                     f" {track.nFrames} frames, expected {self.nFrames} frames"
                 )
             )
+        self._labelIndex.setdefault(track.label, len(self._tracks))
         self._tracks.append(track)
 
+    @property
+    def links(self) -> np.ndarray:
+        """Links between tracks, as pairs of track indexes
+
+        Returns:
+            np.ndarray: array of LinkType items
+        """
+        return self._links
+
+    @links.setter
+    def links(self, value) -> None:
+        self._links = np.asarray(value, dtype=LinkType.btype)
+
     @property
     def tracks(self) -> List[MarkerTrack]:
         """Returns a list of all tracks in the data block
@@ -263,35 +304,49 @@ class Data3D(Block):
         """
         Sets the tracks in the data block.
         """
-        oldTracks = self._tracks
-        self._tracks = []
+        oldTracks, oldLabelIndex = self._tracks, self._labelIndex
+        self._tracks, self._labelIndex = [], {}
         try:
             for value in values:
                 self.add_track(value)
         except Exception as e:
-            self._tracks = oldTracks
+            self._tracks, self._labelIndex = oldTracks, oldLabelIndex
             raise e
 
+    def _track_index(self, label: str) -> Optional[int]:
+        """Position of the first track with the given label, or None.
+
+        The label index is only a hint: tracks and labels are public and can be
+        changed behind the block's back, so every hit is checked and the index
+        is rebuilt whenever it does not hold.
+        """
+        index = self._labelIndex.get(label)
+        if (
+            index is not None
+            and index < len(self._tracks)
+            and self._tracks[index].label == label
+        ):
+            return index
+        self._labelIndex = {}
+        for i, track in enumerate(self._tracks):
+            self._labelIndex.setdefault(track.label, i)
+        return self._labelIndex.get(label)
+
     @staticmethod
     def _build(stream, format) -> "Data3D":
         format = Data3dBlockFormat(format)
-        nFrames = i32.bread(stream)
-        frequency = i32.bread(stream)
-        startTime = f32.bread(stream)
-        nTracks = u32.bread(stream)
-        volume = Volume.bread(stream)
-        rotationMatrix = MAT3X3F.bread(stream)
-        translationVector = VEC3F.bread(stream)
-        flag = Flags(u32.bread(stream))
+        header = Data3DHeader.bread(stream)
+        nFrames = header["nFrames"]
+        nTracks = header["nTracks"]
 
         d = Data3D(
-            frequency,
+            header["frequency"],
             nFrames,
-            volume,
-            rotationMatrix,
-            translationVector,
-            startTime,
-            flag,
+            header["volume"],
+            header["rotationMatrix"],
+            header["translationVector"],
+            header["startTime"],
+            Flags(header["flag"]),
             format,
         )
 
@@ -313,10 +368,10 @@ class Data3D(Block):
         if isinstance(key, int):
             return self._tracks[key]
         elif isinstance(key, str):
-            try:
-                return next(track for track in self._tracks if track.label == key)
-            except StopIteration:
+            index = self._track_index(key)
+            if index is None:
                 raise KeyError(f"Track with label {key} not found")
+            return self._tracks[index]
         raise TypeError(f"Invalid key type {type(key)}")
 
     def __iter__(self) -> Iterator[MarkerTrack]:
@@ -326,17 +381,23 @@ class Data3D(Block):
         return len(self._tracks)
 
     def __eq__(self, other) -> bool:
-        buff1 = BytesIO()
-        buff2 = BytesIO()
-        self._write(buff1)
-        other._write(buff2)
-        return buff1.getvalue() == buff2.getvalue()
+        if not isinstance(other, Data3D):
+            return False
+        if self.format in [Data3dBlockFormat.byFrame, Data3dBlockFormat.byTrack]:
+            if not np.array_equal(self.links, other.links):
+                return False
+        # the header fields are compared as they are stored
+        return (
+            self.format == other.format
+            and self._header() == other._header()
+            and self._tracks == other._tracks
+        )
 
     def __contains__(self, value: Union[MarkerTrack, str]) -> bool:
         if isinstance(value, MarkerTrack):
             return value in self._tracks
         elif isinstance(value, str):
-            return any(track.label == value for track in self._tracks)
+            return self._track_index(value) is not None
         raise TypeError(f"Invalid value type {type(value)}")
 
     @property
@@ -348,6 +409,20 @@ class Data3D(Block):
         """
         return len(self._tracks)
 
+    def _header(self) -> bytes:
+        return Data3DHeader.write(
+            (
+                self.nFrames,
+                self.frequency,
+                self.startTime,
+                len(self._tracks),
+                self.volume,
+                self.rotationMatrix,
+                self.translationVector,
+                self.flag.value,
+            )
+        )
+
     def _write(self, file: BinaryIO) -> None:
         if self.format not in [
             Data3dBlockFormat.byTrack,
@@ -357,68 +432,31 @@ class Data3D(Block):
                 f"Data3D format {self.format} not implemented yet"
             )
 
-        # nFrames
-        i32.bwrite(file, self.nFrames)
-        # frequency
-        i32.bwrite(file, self.frequency)
-        # startTime
-        f32.bwrite(file, self.startTime)
-        # nTracks
-        u32.bwrite(file, len(self._tracks))
-
-        # volume
-        Volume.bwrite(file, self.volume)
-        # rotationMatrix
-        MAT3X3F.bwrite(file, self.rotationMatrix)
-        # translationVector
-        VEC3F.bwrite(file, self.translationVector)
-        # flags
-        u32.bwrite(file, self.flag.value)
+        # the block is assembled in memory and written at once
+        parts = [self._header()]
 
         if self.format in [
             Data3dBlockFormat.byFrame,
             Data3dBlockFormat.byTrack,
         ]:
-            links = self.links if hasattr(self, "links") else []
-            nLinks = len(links)
+            parts += [
+                i32.write(len(self.links)),  # nLinks
+                i32.pad(1),  # padding
+                self.links.tobytes(),  # links
+            ]
 
-            # nLinks
-            i32.bwrite(file, nLinks)
-            # padding
-            i32.bpad(file)
-            # links
-            LinkType.bwrite(file, links)
-
-        for track in self._tracks:
-            track._write(file)
+        parts += [track._pack() for track in self._tracks]
+        file.write(b"".join(parts))
 
     @property
     def nBytes(self) -> int:
-        base = (
-            4  # nFrames
-            + 4  # frequency
-            + 4  # startTime
-            + 4  # nTracks
-            + Volume.btype.itemsize  # volume
-            + MAT3X3F.btype.itemsize  # rotationMatrix
-            + VEC3F.btype.itemsize  # translationVector
-            + 4  # flags
-        )
+        base = Data3DHeader.btype.itemsize
 
         if self.format in [
             Data3dBlockFormat.byFrame,
             Data3dBlockFormat.byTrack,
         ]:
-            links_size = (
-                4
-                + 4
-                + (
-                    LinkType.btype.itemsize * len(self.links)
-                    if hasattr(self, "links")
-                    else 0
-                )
-            )
-            base += links_size
+            base += 4 + 4 + LinkType.btype.itemsize * len(self.links)
 
         for track in self._tracks:
             base += track.nBytes
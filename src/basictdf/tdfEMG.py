@@ -34,15 +34,27 @@ with tdf.allow_write() as tdf:
 
 
 from enum import Enum
-from typing import Iterator, Union
+from typing import Iterator, List, Optional, Union
 
 import numpy as np
 
 from basictdf.tdfBlock import Block, BlockType, Sized, BuildWriteable
 from basictdf.tdfTypes import BTSString, TdfType, f32, i16, i32
+from basictdf.tdfUtils import count_segments, finite_segments, pack_segments
 
 SegmentData = TdfType(np.dtype([("startFrame", "<i4"), ("nFrames", "<i4")]))
 
+EMGHeader = TdfType(
+    np.dtype(
+        [
+            ("nSignals", "<i4"),
+            ("frequency", "<i4"),
+            ("startTime", "<f4"),
+            ("nSamples", "<i4"),
+        ]
+    )
+)
+
 
 class EMGBlockFormat(Enum):
     unknownFormat = 0
@@ -64,9 +76,8 @@ class EMGTrack(Sized, BuildWriteable):
         return self.data.shape[0]
 
     @property
-    def _segments(self):
-        maskedTrackData = np.ma.masked_invalid(self.data)
-        return np.ma.clump_unmasked(maskedTrackData.T)
+    def _segments(self) -> List[slice]:
+        return finite_segments(self.data)
 
     @staticmethod
     def _build(stream, nSamples) -> "EMGTrack":
@@ -74,43 +85,50 @@ class EMGTrack(Sized, BuildWriteable):
         nSegments = i32.bread(stream)
         i32.skip(stream)  # padding
         segmentData = SegmentData.bread(stream, nSegments)
-        trackData = np.empty(nSamples, dtype="<f4")
-        trackData[:] = np.nan
-        for startFrame, nFrames in segmentData:
-            trackData[startFrame : startFrame + nFrames] = f32.bread(stream, nFrames)
-        return EMGTrack(label, trackData)
-
-    def _write(self, file) -> None:
-        # label
-        BTSString.bwrite(file, 256, self.label)
 
-        segments = self._segments
-
-        # nSegments
-        i32.bwrite(file, len(segments))
-
-        # padding
-        i32.bpad(file, 1)
+        # the segments are stored back to back, so they are read at once
+        samples = f32.bread(stream, int(segmentData["nFrames"].sum()))
+        trackData = np.full(nSamples, np.nan, dtype="<f4")
+        offset = 0
+        for startFrame, nFrames in segmentData.tolist():
+            trackData[startFrame : startFrame + nFrames] = samples[
+                offset : offset + nFrames
+            ]
+            offset += nFrames
+        return EMGTrack(label, trackData)
 
-        for segment in segments:
-            # startFrame
-            i32.bwrite(file, segment.start)
-            # nFrames
-            i32.bwrite(file, segment.stop - segment.start)
+    def _pack(self) -> bytes:
+        # the segments cover exactly the finite samples, in order
+        valid = np.isfinite(self.data)
+        return b"".join(
+            [
+                BTSString.write(256, self.label),  # label
+                pack_segments(valid),  # nSegments, padding, segmentData
+                f32.write(self.data[valid]),  # data
+            ]
+        )
 
-        for segment in segments:
-            # data
-            f32.bwrite(file, self.data[segment])
+    def _write(self, file) -> None:
+        file.write(self._pack())
 
     @property
     def nBytes(self):
-        base = 256 + 4 + 4
-        for segment in self._segments:
-            base += 4 + 4 + (segment.stop - segment.start) * f32.btype.itemsize
-        return base
+        valid = np.isfinite(self.data)
+        nSegments = count_segments(valid)
+        return (
+            256  # label
+            + 4  # nSegments
+            + 4  # padding
+            + (4 + 4) * nSegments  # startFrame, nFrames
+            + f32.btype.itemsize * int(np.count_nonzero(valid))  # data
+        )
 
     def __eq__(self, other):
-        return self.label == other.label and np.all(self.data == other.data)
+        if not isinstance(other, EMGTrack):
+            return False
+        return self.label == other.label and np.array_equal(
+            self.data, other.data, equal_nan=True
+        )
 
     def __repr__(self) -> str:
         return (
@@ -133,15 +151,19 @@ class EMG(Block):
         self.nSamples = nSamples
         self._signals = []
         self._emgMap = []
+        self._channels = set()
+        self._maxChannel = -1
+        self._labelIndex = {}
         self.format = format
 
     @staticmethod
     def _build(stream, format) -> "EMG":
         format = EMGBlockFormat(format)
-        nSignals = i32.bread(stream)
-        frequency = i32.bread(stream)
-        startTime = f32.bread(stream)
-        nSamples = i32.bread(stream) + 49  # Why 49??? Whyyyy????
+        header = EMGHeader.bread(stream)
+        nSignals = header["nSignals"]
+        frequency = header["frequency"]
+        startTime = header["startTime"]
+        nSamples = header["nSamples"] + 49  # Why 49??? Whyyyy????
         emgMap = i16.bread(stream, n=nSignals)
 
         d = EMG(frequency, nSamples, startTime, format)
@@ -157,42 +179,57 @@ class EMG(Block):
         if self.format != EMGBlockFormat.byTrack:
             raise NotImplementedError(f"EMG format {self.format} not implemented yet")
 
-        # nSignals
-        i32.bwrite(file, len(self._signals))
-
-        # frequency
-        i32.bwrite(file, self.frequency)
-
-        # startTime
-        f32.bwrite(file, self.startTime)
-
-        # nSamples
-        i32.bwrite(file, self.nSamples - 49)  # That 49 again
-
-        # emgMap
-        i16.bwrite(file, self._emgMap)
-
-        # signals
-        for signal in self._signals:
-            signal._write(file)
+        # the block is assembled in memory and written at once
+        parts = [
+            EMGHeader.write(
+                (
+                    len(self._signals),
+                    self.frequency,
+                    self.startTime,
+                    self.nSamples - 49,  # That 49 again
+                )
+            ),
+            i16.write(self._emgMap),  # emgMap
+        ]
+        parts += [signal._pack() for signal in self._signals]
+        file.write(b"".join(parts))
 
     def __getitem__(self, key) -> EMGTrack:
         if isinstance(key, int):
             return self._signals[key]
         elif isinstance(key, str):
-            try:
-                return next(signal for signal in self._signals if signal.label == key)
-            except StopIteration:
+            index = self._signal_index(key)
+            if index is None:
                 raise KeyError(f"EMG signal with label {key} not found")
+            return self._signals[index]
         raise TypeError(f"Invalid key type {type(key)}")
 
     def __contains__(self, value: Union[EMGTrack, str]) -> bool:
         if isinstance(value, str):
-            return any(signal.label == value for signal in self._signals)
+            return self._signal_index(value) is not None
         elif isinstance(value, EMGTrack):
             return value in self._signals
         raise TypeError(f"Invalid value type {type(value)}")
 
+    def _signal_index(self, label: str) -> Optional[int]:
+        """Position of the first signal with the given label, or None.
+
+        Like Data3D._track_index, the label index is only a hint: a hit is
+        trusted if the signal there still has that label, otherwise the index
+        is rebuilt.
+        """
+        index = self._labelIndex.get(label)
+        if (
+            index is not None
+            and index < len(self._signals)
+            and self._signals[index].label == label
+        ):
+            return index
+        self._labelIndex = {}
+        for i, signal in enumerate(self._signals):
+            self._labelIndex.setdefault(signal.label, i)
+        return self._labelIndex.get(label)
+
     def __iter__(self) -> Iterator[EMGTrack]:
         return iter(self._signals)
 
@@ -203,10 +240,12 @@ class EMG(Block):
         if not isinstance(other, EMG):
             return False
         return (
-            self.frequency == other.frequency
+            self.format == other.format
+            and self.frequency == other.frequency
             and self.startTime == other.startTime
             and self.nSamples == other.nSamples
-            and all(s1 == s2 for s1, s2 in zip(self._signals, other._signals))
+            and self._emgMap == other._emgMap
+            and self._signals == other._signals
         )
 
     def addSignal(self, signal: EMGTrack, channel=None) -> None:
@@ -225,32 +264,34 @@ class EMG(Block):
             )
 
         if channel is None:
-            if len(self._emgMap) == 0:
-                next_channel = 0
-            else:
-                next_channel = max(self._emgMap) + 1
-            self._emgMap.append(next_channel)
-        else:
-            if channel in self._emgMap:
-                raise ValueError(f"Channel {channel} already in use")
-            self._emgMap.append(channel)
+            channel = self._maxChannel + 1
+        elif channel in self._channels:
+            raise ValueError(f"Channel {channel} already in use")
+        self._emgMap.append(channel)
+        self._channels.add(channel)
+        self._maxChannel = max(self._maxChannel, channel)
+        self._labelIndex.setdefault(signal.label, len(self._signals))
         self._signals.append(signal)
 
     def removeSignal(self, label: str) -> None:
         """
         Removes a signal specified by its label from the EMG block
         """
-        try:
-            pos = next(i for i, v in enumerate(self._signals) if v == label)
-        except StopIteration:
+        pos = self._signal_index(label)
+        if pos is None:
             raise KeyError(f"EMG signal with label {label} not found")
 
         del self._signals[pos]
-        del self._emgMap[pos]
+        # later signals have moved, the index is rebuilt on the next lookup
+        self._labelIndex = {}
+        channel = self._emgMap.pop(pos)
+        self._channels.discard(channel)
+        if channel == self._maxChannel:
+            self._maxChannel = max(self._emgMap, default=-1)
 
     @property
     def nBytes(self) -> int:
-        base = 4 + 4 + 4 + 2 * len(self._signals) + 4
+        base = EMGHeader.btype.itemsize + 2 * len(self._signals)
         for signal in self._signals:
             base += signal.nBytes
         return base
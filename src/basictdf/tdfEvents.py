@@ -30,12 +30,11 @@ class Event(Sized, BuildWriteable):
         self.type = type
         if not is_iterable(values):
             raise TypeError("Values must be iterable")
-        if isinstance(values, np.ndarray) and values.dtype == np.dtype("<f4"):
-            self.values = values
-        else:
-            self.values = np.array(values, dtype="<f4")
+        if not hasattr(values, "__len__"):
+            values = np.fromiter(values, dtype="<f4")
+        self.values = np.asarray(values, dtype="<f4")
 
-        if len(values) > 1 and type == EventsDataType.singleEvent:
+        if len(self.values) > 1 and type == EventsDataType.singleEvent:
             raise TypeError("Can't have more than one value for a single event")
 
     def _write(self, stream) -> None:
@@ -49,7 +48,8 @@ class Event(Sized, BuildWriteable):
         label = BTSString.bread(stream, 256)
         type_ = EventsDataType(u32.bread(stream))
         nItems = i32.bread(stream)
-        values = np.array([f32.bread(stream) for _ in range(nItems)])
+        # copied, as the values read from the stream are read-only
+        values = f32.bread(stream, nItems).copy()
         return Event(label, values, type_)
 
     def __len__(self) -> int:
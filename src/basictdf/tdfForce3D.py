@@ -5,7 +5,6 @@ as the force platform data. These vectors can correspond to some other force or
 like, for example, the right or left foot across multiple platforms."""
 
 from enum import Enum
-from io import BytesIO
 from typing import BinaryIO, Iterable, Iterator, List, NoReturn, Type, Union
 
 import numpy as np
@@ -22,9 +21,13 @@ from basictdf.tdfTypes import (
     u32,
     SegmentData,
 )
+from basictdf.tdfUtils import count_segments, finite_segments, pack_segments
 
 ForceType = ApplicationPointType = TorqueType = TdfType(np.dtype("<3f4"))
 
+FrameType = TdfType(np.dtype("(3,3)<f4"))
+"A frame of a track: application point, force and torque"
+
 
 class ForceTorqueTrack(Sized, BuildWriteable):
     """
@@ -51,9 +54,8 @@ class ForceTorqueTrack(Sized, BuildWriteable):
         self.torque = torque
 
     @property
-    def _segments(self):
-        maskedPressureData = np.ma.masked_invalid(self.application_point)
-        return np.ma.clump_unmasked(maskedPressureData.T[0])
+    def _segments(self) -> List[slice]:
+        return finite_segments(self.application_point[:, 0])
 
     @_segments.setter
     def _segments(self, value) -> NoReturn:
@@ -68,15 +70,20 @@ class ForceTorqueTrack(Sized, BuildWriteable):
 
     @property
     def nBytes(self) -> int:
-        segments = self._segments
-        base = 256 + 4 + 4 + SegmentData.btype.itemsize * len(segments)
-        for segment in segments:
-            base += (segment.stop - segment.start) * (
+        valid = np.isfinite(self.application_point[:, 0])
+        nSegments = count_segments(valid)
+        return (
+            256  # label
+            + 4  # nSegments
+            + 4  # padding
+            + SegmentData.btype.itemsize * nSegments  # segmentData
+            + int(np.count_nonzero(valid))
+            * (
                 ApplicationPointType.btype.itemsize
                 + ForceType.btype.itemsize
                 + TorqueType.btype.itemsize
             )
-        return base
+        )
 
     @staticmethod
     def _build(stream, frames: int) -> "ForceTorqueTrack":
@@ -89,67 +96,57 @@ class ForceTorqueTrack(Sized, BuildWriteable):
 
         segmentData = SegmentData.bread(stream, nSegments)
 
-        application_point_data = np.empty(frames, dtype=ApplicationPointType.btype)
-        application_point_data[:] = np.nan
-
-        force_data = np.empty(frames, dtype=ForceType.btype)
-        force_data[:] = np.nan
-
-        torque_data = np.empty(frames, dtype=TorqueType.btype)
-        torque_data[:] = np.nan
-
-        for startFrame, nFrames in segmentData:
-            for frame in range(startFrame, startFrame + nFrames):
-                application_point_data[frame] = ApplicationPointType.bread(stream)
-                force_data[frame] = ForceType.bread(stream)
-                torque_data[frame] = TorqueType.bread(stream)
+        # one buffer holds the application point, force and torque of every
+        # frame, in the same layout as the file
+        trackData = np.full(frames, np.nan, dtype=FrameType.btype)
+
+        # the segments are stored back to back, so they are read at once
+        points = FrameType.bread(stream, int(segmentData["nFrames"].sum()))
+        offset = 0
+        for startFrame, nFrames in segmentData.tolist():
+            trackData[startFrame : startFrame + nFrames] = points[
+                offset : offset + nFrames
+            ]
+            offset += nFrames
         return ForceTorqueTrack(
             label=label,
-            application_point=application_point_data,
-            force=force_data,
-            torque=torque_data,
+            application_point=trackData[:, 0],
+            force=trackData[:, 1],
+            torque=trackData[:, 2],
         )
 
-    def _write(self, file: BinaryIO) -> None:
-        # label
-        BTSString.bwrite(file, 256, self.label)
-
-        segments = self._segments
-        nSegments = len(segments)
-
-        # nSegments
-        i32.bwrite(file, nSegments)
+    def _pack(self) -> bytes:
+        # the segments cover exactly the frames with a finite application point
+        valid = np.isfinite(self.application_point[:, 0])
+        # applicationPoint, force and torque are interleaved frame by frame
+        frames = np.concatenate(
+            [self.application_point[valid], self.force[valid], self.torque[valid]],
+            axis=1,
+        )
+        return b"".join(
+            [
+                BTSString.write(256, self.label),  # label
+                pack_segments(valid),  # nSegments, padding, segmentData
+                f32.write(frames),  # applicationPoint, force, torque
+            ]
+        )
 
-        # padding
-        i32.bpad(file)
-
-        # segmentData
-        for segment in segments:
-            # startFrame
-            i32.bwrite(file, segment.start)
-            # nFrames
-            i32.bwrite(file, segment.stop - segment.start)
-
-        for segment in segments:
-            for frame in range(segment.start, segment.stop):
-                # applicationPoint
-                ApplicationPointType.bwrite(file, self.application_point[frame])
-                # force
-                ForceType.bwrite(file, self.force[frame])
-                # torque
-                TorqueType.bwrite(file, self.torque[frame])
+    def _write(self, file: BinaryIO) -> None:
+        file.write(self._pack())
 
     def __repr__(self) -> str:
         return f"ForceTorqueTrack(label={self.label}, nFrames={self.nFrames})"
 
     def __eq__(self, other: Type["ForceTorqueTrack"]) -> bool:
+        if not isinstance(other, ForceTorqueTrack):
+            return False
         return (
             self.label == other.label
-            and np.allclose(
-                self.application_point, other.application_point, equal_nan=True
+            and ApplicationPointType.equal(
+                self.application_point, other.application_point
             )
-            and np.allclose(self.force, other.force, equal_nan=True)
-            and np.allclose(self.torque, other.torque, equal_nan=True)
+            and ForceType.equal(self.force, other.force)
+            and TorqueType.equal(self.torque, other.torque)
         )
 
 
@@ -241,31 +238,27 @@ class ForceTorque3D(Block):
         f._tracks = [ForceTorqueTrack._build(stream, nFrames) for _ in range(nTracks)]
         return f
 
+    def _header(self) -> bytes:
+        return b"".join(
+            [
+                u32.write(len(self._tracks)),  # nTracks
+                i32.write(self.frequency),  # frequency
+                f32.write(self.startTime),  # startTime
+                i32.write(self.nFrames),  # nFrames
+                Volume.write(self.volume),  # volume
+                MAT3X3F.write(self.rotationMatrix),  # rotationMatrix
+                VEC3F.write(self.translationVector),  # translationVector
+                i32.pad(1),  # padding
+            ]
+        )
+
     def _write(self, file) -> None:
         if self.format != ForceTorque3DBlockFormat.byTrack:
             raise NotImplementedError(
                 f"Force3D format {self.format} not implemented yet"
             )
 
-        # nTracks
-        u32.bwrite(file, len(self._tracks))
-        # frequency
-        i32.bwrite(file, self.frequency)
-        # startTime
-        f32.bwrite(file, self.startTime)
-        # nFrames
-        i32.bwrite(file, self.nFrames)
-
-        # volume
-        Volume.bwrite(file, self.volume)
-        # rotationMatrix
-        MAT3X3F.bwrite(file, self.rotationMatrix)
-        # translationVector
-        VEC3F.bwrite(file, self.translationVector)
-
-        # padding
-        i32.bpad(file)
-
+        file.write(self._header())
         for track in self._tracks:
             track._write(file)
 
@@ -338,11 +331,13 @@ class ForceTorque3D(Block):
         return len(self._tracks)
 
     def __eq__(self, other) -> bool:
-        buff1 = BytesIO()
-        buff2 = BytesIO()
-        self._write(buff1)
-        other._write(buff2)
-        return buff1.getvalue() == buff2.getvalue()
+        if not isinstance(other, ForceTorque3D):
+            return False
+        return (
+            self.format == other.format
+            and self._header() == other._header()
+            and self._tracks == other._tracks
+        )
 
     @property
     def nTracks(self) -> int:
@@ -3,12 +3,18 @@ Force platform data module.
 """
 
 from enum import Enum
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
 
 import numpy as np
 
 from basictdf.tdfBlock import Block, BlockType, BuildWriteable, Sized
 from basictdf.tdfTypes import SegmentData, TdfType, f32, i32, u16
+from basictdf.tdfUtils import (
+    count_segments,
+    finite_segments,
+    mask_segments,
+    pack_segments,
+)
 
 PlatDataType = TdfType(
     np.dtype([("application_point", "2<f4"), ("force", "3<f4"), ("torque", "<f4")])
@@ -63,7 +69,7 @@ class ForcePlatformData(Sized, BuildWriteable):
         n_segments = i32.bread(stream)
         i32.skip(stream)  # padding
         segment_data = SegmentData.bread(stream, n_segments)
-        data = np.empty(n_frames, dtype=PlatDataType.btype)
+        data = np.full(n_frames, np.nan, dtype=PlatDataType.btype)
         for start_frame, n_frames in segment_data:
             dat = PlatDataType.bread(stream, n_frames)
             data[start_frame : start_frame + n_frames] = dat
@@ -73,10 +79,9 @@ class ForcePlatformData(Sized, BuildWriteable):
         return ForcePlatformData(application_point, force, torque)
 
     @property
-    def _segments(self):
-        # Wherever application_point is masked, force and torque are also masked
-        maskedData = np.ma.masked_invalid(self.application_point)
-        return np.ma.clump_unmasked(maskedData.T[0])
+    def _segments(self) -> List[slice]:
+        # Wherever application_point is missing, force and torque are also missing
+        return finite_segments(self.application_point[:, 0])
 
     def _get_segment_data(self, segment):
         start, stop = segment.start, segment.stop
@@ -90,29 +95,23 @@ class ForcePlatformData(Sized, BuildWriteable):
             raise NotImplementedError(
                 f"ForcePlatformDataBlock format {format} not implemented"
             )
-        segments = self._segments
-        i32.bwrite(stream, len(segments))
-        i32.bpad(stream)
-        for segment in segments:
-            # startFrame
-            i32.bwrite(stream, np.array(segment.start))
-            # nFrames
-            i32.bwrite(stream, np.array(segment.stop - segment.start))
-
-        for segment in segments:
+        valid = np.isfinite(self.application_point[:, 0])
+        # nSegments, padding, segmentData
+        stream.write(pack_segments(valid))
+        for segment in mask_segments(valid):
             PlatDataType.bwrite(stream, self._get_segment_data(segment))
 
     @property
     def nBytes(self) -> int:
         "Size in bytes of the platform data"
-        nSegments = len(self._segments)
-
-        base = 4 + 4 + (4 + 4) * nSegments
-
-        for segment in self._segments:
-            base += PlatDataType.btype.itemsize * (segment.stop - segment.start)
-
-        return base
+        valid = np.isfinite(self.application_point[:, 0])
+        nSegments = count_segments(valid)
+        return (
+            4  # nSegments
+            + 4  # padding
+            + (4 + 4) * nSegments  # startFrame, nFrames
+            + PlatDataType.btype.itemsize * int(np.count_nonzero(valid))  # data
+        )
 
     def __repr__(self):
         return (
@@ -7,6 +7,8 @@ from typing import IO, BinaryIO, Generic, Optional, TypeVar, Union
 import numpy as np
 import numpy.typing as npt
 
+_DATE_STRUCT = struct.Struct("<i")
+
 
 class BTSDate:
     """
@@ -16,7 +18,12 @@ class BTSDate:
     @staticmethod
     def read(data) -> datetime:
         "Read a BTSDate from bytes"
-        return datetime.fromtimestamp(struct.unpack("<i", data)[0])
+        return datetime.fromtimestamp(_DATE_STRUCT.unpack(data)[0])
+
+    @staticmethod
+    def unpack_from(buffer, offset: int = 0) -> datetime:
+        "Read a BTSDate from a buffer at the given offset, without copying it"
+        return datetime.fromtimestamp(_DATE_STRUCT.unpack_from(buffer, offset)[0])
 
     @staticmethod
     def bread(f) -> datetime:
@@ -26,7 +33,7 @@ class BTSDate:
     @staticmethod
     def write(data) -> bytes:
         "Write a BTSDate to bytes"
-        return struct.pack("<i", int(data.timestamp()))
+        return _DATE_STRUCT.pack(int(data.timestamp()))
 
     @staticmethod
     def bwrite(file, data) -> None:
@@ -51,22 +58,19 @@ class BTSString:
         Returns:
             str: a Python string
         """
-        la = struct.unpack(f"{size}s", data)[0]
-        try:
-            pos = la.index(b"\x00")
-            return la[:pos].decode(encoding)
-        except ValueError:
-            return la.decode(encoding)
+        if len(data) != size:
+            raise struct.error(f"unpack requires a buffer of {size} bytes")
+        pos = data.find(b"\x00")
+        return (data[:pos] if pos >= 0 else data).decode(encoding)
 
     @staticmethod
     def write(size: int, data: str) -> bytes:
         dat = data.encode("windows-1252") + b"\x00"
-        padding = b"\x00" * (size - len(dat))
         if len(dat) > size:
             raise ValueError(
                 f"The string is too long: max {size} chars, got {len(dat)}"
             )
-        return dat + padding
+        return dat.ljust(size, b"\x00")
 
     @staticmethod
     def bwrite(file: BinaryIO, size: int, data: str) -> None:
@@ -134,15 +138,25 @@ class TdfType(Generic[X]):
 
     def write(self, data: Union[npt.NDArray[X], X]):
         "Write data to bytes"
-        return (
-            data.astype(self.btype.base).tobytes()
-            if isinstance(data, np.ndarray)
-            else np.array(data, dtype=self.btype.base).tobytes()
-        )
+        return self._buffer(data).tobytes()
 
     def bwrite(self, file: IO[bytes], data: Union[npt.NDArray[X], X]) -> None:
         "Write data to a binary file or buffer"
-        file.write(self.write(data))
+        file.write(self._buffer(data))
+
+    def _buffer(self, data: Union[npt.NDArray[X], X]) -> memoryview:
+        """Flat byte view of the data in the type's layout. Arrays that already
+        are contiguous and of the right type are not copied"""
+        data = np.ascontiguousarray(data, dtype=self.btype.base)
+        return memoryview(data.reshape(-1).view(np.uint8))
+
+    def equal(self, a, b) -> bool:
+        "Whether two values are the same once stored as this type, NaN included"
+        return np.array_equal(
+            np.asarray(a, dtype=self.btype.base),
+            np.asarray(b, dtype=self.btype.base),
+            equal_nan=True,
+        )
 
     def skip(self, file: IO[bytes], n: int = 1) -> None:
         "Skip n items in the file or buffer"
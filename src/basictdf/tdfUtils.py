@@ -1,4 +1,9 @@
 from functools import wraps
+from typing import List
+
+import numpy as np
+
+from basictdf.tdfTypes import SegmentData, i32
 
 __all__ = []
 
@@ -11,6 +16,43 @@ def is_iterable(obj) -> bool:
         return False
 
 
+def finite_segments(values: np.ndarray) -> List[slice]:
+    """Return the slices of the runs of finite values (not NaN nor inf) in a
+    1D array. Same as np.ma.clump_unmasked(np.ma.masked_invalid(values)),
+    without building a masked array."""
+    return mask_segments(np.isfinite(values))
+
+
+def mask_segments(mask: np.ndarray) -> List[slice]:
+    """Return the slices of the runs of True values in a 1D boolean array."""
+    edges = np.flatnonzero(np.diff(mask.view(np.int8), prepend=0, append=0)).tolist()
+    return [slice(start, stop) for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def count_segments(mask: np.ndarray) -> int:
+    """Return the number of runs of True values in a 1D boolean array, without
+    building their slices."""
+    # every run starts where a True value follows a False one
+    return int(np.count_nonzero(np.diff(mask.view(np.int8), prepend=0) == 1))
+
+
+def pack_segments(mask: np.ndarray) -> bytes:
+    """Pack the segment table of a track whose stored frames are the True
+    values of mask: nSegments, padding and a startFrame, nFrames pair for
+    every run."""
+    segments = mask_segments(mask)
+    segmentData = np.array(
+        [(s.start, s.stop - s.start) for s in segments], dtype=SegmentData.btype
+    )
+    return b"".join(
+        [
+            i32.write(len(segments)),  # nSegments
+            i32.pad(1),  # padding
+            SegmentData.write(segmentData),  # startFrame, nFrames
+        ]
+    )
+
+
 class OutsideOfContextError(Exception):
     pass
 
@@ -54,3 +96,18 @@ def provide_context_if_needed(method):
         return method(self, *args, **kwargs)
 
     return wrapper
+
+
+def provide_entries_if_needed(method):
+    """If the jumptable hasn't been parsed yet, or the file changed on disk
+    since, provide a context to parse it. Otherwise the entries from the last
+    context are reused, without reopening the file"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._inside_context and self._changed_on_disk():
+            with self:
+                return method(self, *args, **kwargs)
+        return method(self, *args, **kwargs)
+
+    return wrapper
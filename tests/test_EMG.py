@@ -17,6 +17,21 @@ class TestEMGTrack(TestCase):
         self.assertEqual(a.nSamples, 11)
         self.assertEqual(a.nBytes, 256 + 4 + 4 + 4 + 4 + 11 * 4)
 
+    def test_segments(self) -> None:
+        data = np.array([np.nan, 1, 2, np.nan, np.inf, 5, 6, 7, np.nan])
+        a = EMGTrack("Right Rectus Femoris", data)
+        self.assertEqual(a._segments, [slice(1, 3), slice(5, 8)])
+        self.assertEqual(a.nBytes, 256 + 4 + 4 + 2 * (4 + 4) + 5 * 4)
+
+        # gaps compare equal, a round trip keeps the track equal
+        data[4] = np.nan
+        buff = BytesIO()
+        a._write(buff)
+        buff.seek(0, 0)
+        self.assertEqual(EMGTrack._build(buff, len(data)), a)
+        self.assertNotEqual(a, EMGTrack("Right Rectus Femoris", data[:-1]))
+        self.assertNotEqual(a, "not a track")
+
     def test_build(self) -> None:
         data = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
         b = b""
@@ -113,8 +128,7 @@ class TestEMG(TestCase):
         self.assertEqual(a._signals, [t1, t2])
         self.assertEqual(a._emgMap, [0, 1])
 
-        a._signals = []
-        a._emgMap = []
+        a = EMG(frequency=1000, nSamples=11)
 
         a.addSignal(t1, 5)
         self.assertEqual(a._signals, [t1])
@@ -123,3 +137,61 @@ class TestEMG(TestCase):
         a.addSignal(t2)
         self.assertEqual(a._signals, [t1, t2])
         self.assertEqual(a._emgMap, [5, 6])
+
+        # channels in use are rejected, lower free ones are accepted
+        t3 = EMGTrack("Right Biceps Femoris", np.arange(11))
+        with self.assertRaises(ValueError):
+            a.addSignal(t3, 6)
+        a.addSignal(t3, 2)
+        self.assertEqual(a._emgMap, [5, 6, 2])
+        t4 = EMGTrack("Left Biceps Femoris", np.arange(11))
+        a.addSignal(t4)
+        self.assertEqual(a._emgMap, [5, 6, 2, 7])
+
+    def test_equality(self) -> None:
+        blocks = []
+        for _ in range(2):
+            block = EMG(frequency=1000, nSamples=3)
+            block.addSignal(EMGTrack("a", np.array([1, 2, 3], dtype="<f4")))
+            blocks.append(block)
+        self.assertEqual(blocks[0], blocks[1])
+        self.assertNotEqual(blocks[0], "not a block")
+
+        # an extra signal makes them different
+        blocks[1].addSignal(EMGTrack("b", np.array([1, 2, 3], dtype="<f4")))
+        self.assertNotEqual(blocks[0], blocks[1])
+
+    def test_getitem_by_label(self) -> None:
+        t1 = EMGTrack("a", np.array([1, 2, 3]))
+        t2 = EMGTrack("b", np.array([4, 5, 6]))
+        block = EMG(frequency=1000, nSamples=3)
+        block.addSignal(t1)
+        block.addSignal(t2)
+        self.assertIs(block["b"], t2)
+        self.assertIn("a", block)
+        self.assertNotIn("c", block)
+        with self.assertRaises(KeyError):
+            block["c"]
+
+        # labels can change outside the block
+        t1.label = "c"
+        self.assertIs(block["c"], t1)
+        self.assertNotIn("a", block)
+
+    def test_removeSignal(self) -> None:
+        t1 = EMGTrack("a", np.array([1, 2, 3]))
+        t2 = EMGTrack("b", np.array([4, 5, 6]))
+        block = EMG(frequency=1000, nSamples=3)
+        block.addSignal(t1)
+        block.addSignal(t2)
+        block.removeSignal("a")
+        self.assertEqual(block._signals, [t2])
+        self.assertEqual(block._emgMap, [1])
+        self.assertIs(block["b"], t2)
+        with self.assertRaises(KeyError):
+            block.removeSignal("a")
+
+        # the highest channel is freed
+        block.removeSignal("b")
+        block.addSignal(t1)
+        self.assertEqual(block._emgMap, [0])
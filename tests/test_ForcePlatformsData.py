@@ -61,3 +61,26 @@ class TestForcePlatformData(TestCase):
         self.assertEqual(b.getvalue(), c.getvalue())
         self.assertEqual(f.nBytes, len(b.getvalue()))
         self.assertEqual(new_f.nBytes, len(c.getvalue()))
+
+    def test_gaps(self):
+        application_point = np.array(
+            [[1, 2], [np.nan, np.nan], [5, 6], [7, 8]], dtype=np.float32
+        )
+        force = np.array(
+            [[1, 2, 3], [np.nan] * 3, [7, 8, 9], [10, 11, 12]], dtype=np.float32
+        )
+        torque = np.array([1, np.nan, 3, 4], dtype=np.float32)
+        f = ForcePlatformData(application_point, force, torque)
+        self.assertEqual(f._segments, [slice(0, 1), slice(2, 4)])
+
+        b = BytesIO()
+        f._write(b, format=ForcePlatformBlockFormat.byTrackISSFormat)
+        self.assertEqual(f.nBytes, len(b.getvalue()))
+        b.seek(0, 0)
+        new_f = ForcePlatformData._build(
+            b, ForcePlatformBlockFormat.byTrackISSFormat, 4
+        )
+        # missing frames are read back as NaN
+        np.testing.assert_array_equal(new_f.application_point, application_point)
+        np.testing.assert_array_equal(new_f.force, force)
+        np.testing.assert_array_equal(new_f.torque, torque)
@@ -96,6 +96,10 @@ class TestForceTorqueTrack(TestCase):
         self.assertNotEqual(a, ForceTorqueTrack("track_label", cop, cop, torque))
         self.assertNotEqual(a, ForceTorqueTrack("track_label", cop, force, force))
         self.assertEqual(a, ForceTorqueTrack("track_label", cop, force, torque))
+        self.assertNotEqual(
+            a, ForceTorqueTrack("track_label", cop[:1], force[:1], torque[:1])
+        )
+        self.assertNotEqual(a, "not a track")
 
     def test_write(self):
         cop = np.array([[1, 2, 3], [4, 5, 6]])
@@ -228,3 +232,47 @@ class TestForceTorque3D(TestCase):
         self.assertEqual(dataBlock2.format, ForceTorque3DBlockFormat.byTrack)
         self.assertEqual(dataBlock1, dataBlock2)
         self.assertEqual(buff1.getvalue(), buff2.getvalue())
+
+    def test_equality(self):
+        blocks = []
+        for _ in range(2):
+            block = ForceTorque3D(
+                frequency=100,
+                nFrames=2,
+                volume=np.array([1, 2, 3]),
+                translationVector=np.array([1, 2, 3]),
+                rotationMatrix=np.eye(3),
+            )
+            point = np.array([[1, 2, 3], [np.nan, np.nan, np.nan]])
+            block.tracks = [ForceTorqueTrack("track", point, point * 2, point * 3)]
+            blocks.append(block)
+        self.assertEqual(blocks[0], blocks[1])
+        self.assertNotEqual(blocks[0], "not a block")
+        blocks[1].tracks[0].force[0, 0] = 0
+        self.assertNotEqual(blocks[0], blocks[1])
+        # a change smaller than any tolerance, but still stored
+        blocks[1].tracks[0].force[0, 0] = np.nextafter(np.float32(2), np.float32(3))
+        self.assertNotEqual(blocks[0], blocks[1])
+        blocks[1].tracks[0].force[0, 0] = 2
+        self.assertEqual(blocks[0], blocks[1])
+        blocks[1].tracks = []
+        self.assertNotEqual(blocks[0], blocks[1])
+
+    def test_equality_round_trip(self):
+        # values that float32/int32 storage can't hold exactly
+        block = ForceTorque3D(
+            frequency=100,
+            nFrames=2,
+            volume=np.array([4.07, 1.76, 1.65]),
+            translationVector=np.array([0.1, 0.2, 0.3]),
+            rotationMatrix=np.eye(3) * 0.1,
+            startTime=0.1,
+        )
+        point = np.array([[0.1, 0.2, 0.3], [np.nan, np.nan, np.nan]])
+        block.tracks = [ForceTorqueTrack("track", point, point * 2, point * 3)]
+        buff = BytesIO()
+        block._write(buff)
+        buff.seek(0, 0)
+        self.assertEqual(
+            block, ForceTorque3D._build(buff, ForceTorque3DBlockFormat.byTrack)
+        )
@@ -7,8 +7,9 @@ from unittest import TestCase
 
 import numpy as np
 
-from basictdf.basictdf import Tdf, TdfEntry
+from basictdf.basictdf import Tdf, TdfEntry, _get_block_class
 from basictdf.tdfBlock import BlockType, UnusedBlock
+from basictdf.tdfData2D import Data2D
 from basictdf.tdfEvents import (
     Event,
     EventsDataType,
@@ -106,8 +107,25 @@ class TestTdf(TestCase):
 
         self.assertEqual(len(content), 64 + 288 * len(tdf.entries))
 
-    def test_copy(self) -> None:
+    def test_block_classes(self) -> None:
+        for block_type in BlockType:
+            block_class = _get_block_class(block_type)
+            self.assertEqual(block_class.type, block_type)
+        # implemented blocks take precedence over the placeholders
+        self.assertIs(_get_block_class(BlockType.data2D), Data2D)
+
+    def test_invalid_file(self) -> None:
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "invalid.tdf"
+            for content in [b"", b"not a tdf file", b"\x00" * 4096]:
+                path.write_bytes(content)
+                tdf_file = Tdf(path)
+                with self.assertRaisesRegex(Exception, "Invalid TDF file"):
+                    with tdf_file:
+                        pass
+                self.assertFalse(tdf_file._inside_context)
 
+    def test_copy(self) -> None:
         event = Event("jaja", values=[1, 2, 3], type=EventsDataType.eventSequence)
         eventBlock = TemporalEventsData()
         eventBlock.events.append(event)
@@ -158,6 +176,23 @@ class TestTdf(TestCase):
                 self.assertEqual(before.type, after.type)
                 np.testing.assert_equal(before.values, after.values)
 
+    def test_add_duplicate_block(self) -> None:
+        eventBlock = TemporalEventsData()
+        eventBlock.events.append(Event("jaja", values=[1]))
+
+        tdf_file = Tdf.new("tests/duplicate_test.tdf")
+
+        with tdf_file.allow_write() as tdf:
+            tdf.add_block(eventBlock)
+            self.assertTrue(tdf.has_events)
+            self.assertEqual(
+                tdf._by_type,
+                {BlockType.temporalEventsData: 0, BlockType.unusedSlot: 1},
+            )
+            with self.assertRaises(ValueError):
+                tdf.add_block(eventBlock)
+            self.assertEqual(len(tdf), 1)
+
     def test_remove_block(self) -> None:
         event = Event("jaja", values=[1, 2, 3], type=EventsDataType.eventSequence)
         eventBlock = TemporalEventsData()
@@ -301,6 +336,99 @@ class TestRealTdf(TestCase):
                     self.assertEqual(block, newBlock)
                     self.assertEqual(block.nBytes, entry.size)
 
+    def test_remove_each_block(self) -> None:
+        for file, metadata in test_file_feeder():
+            with Tdf(file) as tdf:
+                types = [e.type for e in tdf.entries if e.type != UnusedBlock.type]
+            for type_ in types:
+                temp_tdf = Tdf(file).copy(self.tempdir_path / f"{type_.name}.tdf")
+                with temp_tdf.allow_write() as tdf:
+                    tdf.remove_block(type_)
+                    self.assertEqual(
+                        [e.header_offset for e in tdf.entries],
+                        [64 + 288 * n for n in range(len(tdf.entries))],
+                    )
+                with temp_tdf as tdf:
+                    self.assertFalse(any(e.type == type_ for e in tdf.entries))
+                    for entry in tdf.entries:
+                        if entry.type == UnusedBlock.type:
+                            self.assertEqual(entry.offset, tdf.nBytes)
+                    # every remaining block can still be read
+                    self.assertEqual(len(tdf.blocks), len(tdf.entries))
+
+    def test_lazy_blocks(self) -> None:
+        for file, metadata in test_file_feeder():
+            with Tdf(file) as tdf:
+                blocks = tdf.blocks
+                self.assertEqual(len(blocks), len(tdf.entries))
+                self.assertEqual(blocks._cache, {})
+                # parsed once, then reused
+                self.assertIs(blocks[0], blocks[0])
+                self.assertIs(blocks[-1], blocks[len(blocks) - 1])
+                self.assertEqual(len(blocks._cache), 2)
+                self.assertEqual(blocks, list(blocks))
+                with self.assertRaises(IndexError):
+                    blocks[len(blocks)]
+                self.assertIs(blocks[np.int64(0)], blocks[0])
+                with self.assertRaises(TypeError):
+                    blocks[0.0]
+
+    def test_lazy_blocks_outside_context(self) -> None:
+        for file, metadata in test_file_feeder():
+            blocks = Tdf(file).blocks
+            # every access reopens the file, which hasn't changed
+            self.assertIs(blocks[0], blocks[0])
+            self.assertEqual(len(blocks._cache), 1)
+
+    def test_lazy_blocks_open_once(self) -> None:
+        class CountingTdf(Tdf):
+            entered = 0
+
+            def __enter__(self) -> "CountingTdf":
+                self.entered += 1
+                return super().__enter__()
+
+        for file, metadata in test_file_feeder():
+            tdf = CountingTdf(file)
+            blocks = tdf.blocks
+            tdf.entered = 0
+            self.assertEqual(len(list(blocks)), len(tdf.entries))
+            self.assertEqual(tdf.entered, 1)
+
+            other = CountingTdf(file)
+            self.assertEqual(blocks, other.blocks)
+            self.assertEqual(tdf.entered, 2)
+            self.assertEqual(other.entered, 2)
+
+    def test_has_block_outside_context(self) -> None:
+        for file, metadata in test_file_feeder():
+            tdf = Tdf(file)
+            self.assertTrue(tdf.has_data3D)
+            # the jumptable is parsed once and reused afterwards
+            raw_entries = tdf._raw_entries
+            self.assertTrue(tdf.has_emg)
+            self.assertFalse(tdf.has_events)
+            self.assertIs(tdf._raw_entries, raw_entries)
+            self.assertEqual(len(tdf), metadata["nBlocks"])
+
+            # a change made by someone else is picked up
+            path = self.tempdir_path / file.name
+            tdf = Tdf(file).copy(path)
+            self.assertFalse(tdf.has_events)
+            eventBlock = TemporalEventsData()
+            eventBlock.events.append(Event("jaja", values=[1]))
+            with Tdf(path).allow_write() as other:
+                other.add_block(eventBlock)
+            self.assertTrue(tdf.has_events)
+            self.assertEqual(len(tdf), metadata["nBlocks"] + 1)
+            self.assertEqual(tdf.events, eventBlock)
+
+    def test_entries_outside_context(self) -> None:
+        for file, metadata in test_file_feeder():
+            entries = Tdf(file).entries
+            with Tdf(file) as tdf:
+                self.assertEqual(entries, tdf.entries)
+
     def test_write(self):
         # Take a file, read it, write everything to a new file,
         # randomly remove blocks, write to a new file, read it, compare
@@ -1,9 +1,10 @@
+from datetime import datetime
 from io import BytesIO
 from unittest import TestCase
 
 import numpy as np
 
-from basictdf.tdfTypes import TdfType
+from basictdf.tdfTypes import BTSDate, BTSString, TdfType
 
 
 class TestTypes(TestCase):
@@ -47,3 +48,21 @@ class TestTypes(TestCase):
         bio.seek(0, 0)
         read = s.bread(bio, 1)
         self.assertEqual(read, np.array([(1, 1)], dtype=dtype))
+
+    def test_date(self):
+        date = datetime(2020, 1, 1, 1, 1)
+        b = BTSDate.write(date)
+        self.assertEqual(len(b), 4)
+        self.assertEqual(BTSDate.read(b), date)
+        self.assertEqual(BTSDate.bread(BytesIO(b)), date)
+        self.assertEqual(BTSDate.unpack_from(b"\x00" * 8 + b, 8), date)
+
+    def test_string(self):
+        b = BTSString.write(8, "abc")
+        self.assertEqual(b, b"abc\x00\x00\x00\x00\x00")
+        self.assertEqual(BTSString.read(8, b), "abc")
+        self.assertEqual(BTSString.bread(BytesIO(b), 8), "abc")
+        # strings that fill the whole field have no terminator
+        self.assertEqual(BTSString.read(4, b"abcd"), "abcd")
+        with self.assertRaises(ValueError):
+            BTSString.write(3, "abc")
@@ -6,6 +6,7 @@ import numpy as np
 from basictdf.tdfData3D import (
     Data3D,
     Data3dBlockFormat,
+    LinkType,
     MarkerTrack,
     TrackType,
 )
@@ -19,6 +20,14 @@ class TestMarkerTrack(TestCase):
         self.assertEqual(a._segments, [slice(0, 2)])
         self.assertEqual(a.nFrames, 2)
 
+    def test_segments(self):
+        data = np.ones((8, 3))
+        data[[0, 3, 4, 7]] = np.nan
+        data[5, 0] = np.inf
+        a = MarkerTrack("marker", data)
+        self.assertEqual(a._segments, [slice(1, 3), slice(6, 7)])
+        self.assertEqual(MarkerTrack("marker", np.empty((0, 3)))._segments, [])
+
     def test_track_properties(self):
         a = MarkerTrack("marker", np.array([[1, 2, 3], [4, 5, 6]]))
         np.testing.assert_equal(a.X, np.array([1, 4]))
@@ -147,6 +156,91 @@ class TestData3D(TestCase):
         self.assertEqual(buff1.getvalue(), buff2.getvalue())
         self.assertEqual(dataBlock1.nBytes, len(buff2.getvalue()))
 
+    def test_links(self):
+        block = Data3D(
+            frequency=100,
+            nFrames=2,
+            volume=np.array([1, 2, 3]),
+            translationVector=np.array([1, 2, 3]),
+            rotationMatrix=np.eye(3),
+        )
+        block.tracks = [
+            MarkerTrack("marker", np.array([[1, 2, 3], [4, 5, 6]])),
+            MarkerTrack("marker2", np.array([[4, 5, 6], [7, 8, 9]])),
+        ]
+        self.assertEqual(len(block.links), 0)
+        block.links = [(0, 1)]
+        self.assertEqual(block.links.dtype, LinkType.btype)
+
+        buff = BytesIO()
+        block._write(buff)
+        self.assertEqual(block.nBytes, len(buff.getvalue()))
+        buff.seek(0, 0)
+        block2 = Data3D._build(buff, Data3dBlockFormat.byTrack)
+        self.assertEqual(block, block2)
+        self.assertEqual(block2.links.tolist(), [(0, 1)])
+
+    def test_equality(self):
+        data = np.array([[1, 2, 3], [np.nan, np.nan, np.nan]])
+        blocks = []
+        for _ in range(2):
+            block = Data3D(
+                frequency=100,
+                nFrames=2,
+                volume=np.array([1, 2, 3]),
+                translationVector=np.array([1, 2, 3]),
+                rotationMatrix=np.eye(3),
+            )
+            block.tracks = [MarkerTrack("marker", data.copy())]
+            blocks.append(block)
+        self.assertEqual(blocks[0], blocks[1])
+        self.assertNotEqual(blocks[0], "not a block")
+        blocks[1].tracks[0].X = np.array([1, 1])
+        self.assertNotEqual(blocks[0], blocks[1])
+
+    def test_equality_round_trip(self):
+        # values that float32/int32 storage can't hold exactly
+        block = Data3D(
+            frequency=100.7,
+            nFrames=2,
+            volume=np.array([4.07, 1.76, 1.65]),
+            translationVector=np.array([0.1, 0.2, 0.3]),
+            rotationMatrix=np.eye(3) * 0.1,
+            startTime=0.1,
+        )
+        block.tracks = [
+            MarkerTrack("marker", np.array([[0.1, 0.2, 0.3], [np.nan] * 3]))
+        ]
+        buff = BytesIO()
+        block._write(buff)
+        buff.seek(0, 0)
+        self.assertEqual(block, Data3D._build(buff, Data3dBlockFormat.byTrack))
+
+    def test_getitem_by_label(self):
+        block = Data3D(
+            frequency=100,
+            nFrames=2,
+            volume=np.array([1, 2, 3]),
+            translationVector=np.array([1, 2, 3]),
+            rotationMatrix=np.eye(3),
+        )
+        t = MarkerTrack("marker", np.array([[1, 2, 3], [4, 5, 6]]))
+        t2 = MarkerTrack("marker2", np.array([[4, 5, 6], [7, 8, 9]]))
+        block.tracks = [t, t2]
+        self.assertIs(block["marker2"], t2)
+        self.assertIn("marker", block)
+        self.assertNotIn("other", block)
+        with self.assertRaises(KeyError):
+            block["other"]
+
+        # labels and the track list can change outside the block
+        t.label = "other"
+        self.assertIs(block["other"], t)
+        self.assertNotIn("marker", block)
+        block.tracks.remove(t)
+        self.assertIs(block["marker2"], t2)
+        self.assertNotIn("other", block)
+
     # def test_files(self) -> None:
     #     with TemporaryDirectory() as tmp_dir:
     #         for file_name, data in test_file_feeder("data3d"):
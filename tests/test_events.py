@@ -22,6 +22,13 @@ class TestEvent(TestCase):
         with self.assertRaises(TypeError):
             Event("hola", values=[1, 2, 3], type=EventsDataType.singleEvent)
 
+        values = np.array([1, 2], dtype="<f4")
+        self.assertIs(
+            Event("hola", values, EventsDataType.eventSequence).values, values
+        )
+        a = Event("hola", (v for v in [1, 2]), EventsDataType.eventSequence)
+        np.testing.assert_equal(a.values, values)
+
     def test_build(self):
         b = b"hola" + b"\x00" * 252
         b += b"\x01\x00\x00\x00"  # type
@@ -32,6 +39,8 @@ class TestEvent(TestCase):
         self.assertEqual(e.type, EventsDataType.eventSequence)
         self.assertEqual(len(e.values), 2)
         np.testing.assert_equal(e.values, np.array([3.0, 4.0]))
+        self.assertEqual(e.values.dtype, np.dtype("<f4"))
+        self.assertTrue(e.values.flags.writeable)
         self.assertEqual(e.nBytes, len(b))
 
     def test_write(self):